@@ -2,20 +2,73 @@
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import functools
 import logging
+import pathlib
 from typing import Any
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_DEVICE_ID, CONF_DEVICE_ID, Platform
-from homeassistant.core import Context, HomeAssistant, ServiceCall
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.const import (
+    ATTR_DEVICE_ID,
+    CONF_DEVICE_ID,
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    State,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.event import Event, async_track_device_registry_updated_event
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import (
+    Event,
+    EventStateChangedData,
+    async_track_device_registry_updated_event,
+    async_track_state_change_event,
+)
 from homeassistant.helpers.helper_integration import async_remove_helper_devices
+from homeassistant.util import dt as dt_util
 
+from . import metrics, websocket_api
 from .const import DOMAIN
-from .model import alarm_command, alarm_state_command, chime_command
+from .controller import DEFAULT_CONCURRENCY
+from .data import (
+    DATA_KEYPADS,
+    RingKeypadConfigEntry,
+    RingKeypadData,
+    resolve_zwave_device_ids,
+)
+from .discovery import async_unconfigured_keypads
+from .dispatch import (
+    DATA_DISPATCHER,
+    DEFAULT_IDEMPOTENCY_WINDOW,
+    ZWAVE_DOMAIN,
+    CommandDispatcher,
+    CommandRequest,
+    CommandSuperseded,
+)
+from .group import DATA_GROUPS, KeypadGroups
+from .model import (
+    ALARM,
+    ALARM_STATE,
+    CHIME,
+    alarm_command,
+    alarm_state_command,
+    chime_command,
+)
+from .profiler import ProfileSession
+from .refresh import DATA_REFRESHER, StateRefresher
+from .stream import DATA_STREAM, KeypadEventStream
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,55 +80,176 @@ CONF_DELAY = "delay"
 CONF_CHIME = "chime"
 CONF_ALARM = "alarm"
 CONF_VOLUME = "volume"
+CONF_COMMANDS = "commands"
+CONF_WAIT = "wait"
+CONF_IDEMPOTENCY_WINDOW = "idempotency_window"
+CONF_GROUP = "group"
+CONF_GROUPS = "groups"
+CONF_REFRESH_INTERVAL = "refresh_interval"
+CONF_CONTROLLER_CONCURRENCY = "controller_concurrency"
+CONF_SECONDS = "seconds"
+CONF_CPROFILE = "cprofile"
+
+# Unique id suffix of the Z-Wave JS node status sensor
+NODE_STATUS_SUFFIX = ".node_status"
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_IDEMPOTENCY_WINDOW, default=DEFAULT_IDEMPOTENCY_WINDOW
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(CONF_GROUPS, default={}): {
+                    cv.slug: vol.All(cv.ensure_list, [cv.string])
+                },
+                # Commands sent to each Z-Wave JS controller at the same time
+                vol.Optional(
+                    CONF_CONTROLLER_CONCURRENCY, default=DEFAULT_CONCURRENCY
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                # Seconds between refreshes of each keypad, 0 disables refresh
+                vol.Optional(CONF_REFRESH_INTERVAL, default=0): vol.Any(
+                    0, vol.All(vol.Coerce(int), vol.Range(min=60, max=86400))
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
 
-ZWAVE_DOMAIN = "zwave_js"
-ZWAVE_SET_VALUE = "set_value"
+DEVICE_IDS_SCHEMA = vol.All(cv.ensure_list, [cv.string])
+TARGET_SCHEMA = {
+    vol.Optional(ATTR_DEVICE_ID): DEVICE_IDS_SCHEMA,
+    vol.Optional(CONF_GROUP): vol.All(cv.ensure_list, [cv.string]),
+}
 
 UPDATE_ALARM_STATE_SERVICE = "update_alarm_state"
 UPDATE_ALARM_STATE_SCHEMA = vol.All(
     vol.Schema(
         {
-            vol.Required(CONF_ALARM_STATE): cv.string,
+            vol.Required(CONF_ALARM_STATE): vol.In(ALARM_STATE),
             vol.Optional(CONF_DELAY): vol.Any(
                 vol.All(vol.Coerce(int), vol.Range(min=0, max=300)), None
             ),
-            vol.Required(ATTR_DEVICE_ID): cv.ensure_list,
+            **TARGET_SCHEMA,
         }
     ),
-    cv.has_at_least_one_key(ATTR_DEVICE_ID),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, CONF_GROUP),
 )
 
 CHIME_SERVICE = "chime"
 CHIME_SCHEMA = vol.All(
     vol.Schema(
         {
-            vol.Required(CONF_CHIME): cv.string,
+            vol.Required(CONF_CHIME): vol.In(CHIME),
             vol.Optional(CONF_VOLUME): vol.Any(
                 vol.All(vol.Coerce(int), vol.Range(min=1, max=100)), None
             ),
-            vol.Required(ATTR_DEVICE_ID): cv.ensure_list,
+            **TARGET_SCHEMA,
         }
     ),
-    cv.has_at_least_one_key(ATTR_DEVICE_ID),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, CONF_GROUP),
 )
 
 ALARM_SERVICE = "alarm"
 ALARM_SCHEMA = vol.All(
     vol.Schema(
         {
-            vol.Required(CONF_ALARM): cv.string,
+            vol.Required(CONF_ALARM): vol.In(ALARM),
+            vol.Optional(CONF_VOLUME): vol.Any(
+                vol.All(vol.Coerce(int), vol.Range(min=1, max=100)), None
+            ),
+            **TARGET_SCHEMA,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, CONF_GROUP),
+)
+
+
+SEND_COMMANDS_SERVICE = "send_commands"
+COMMAND_STEP_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(CONF_ALARM_STATE, "command"): vol.In(ALARM_STATE),
+            vol.Exclusive(CONF_CHIME, "command"): vol.In(CHIME),
+            vol.Exclusive(CONF_ALARM, "command"): vol.In(ALARM),
+            vol.Optional(CONF_DELAY): vol.Any(
+                vol.All(vol.Coerce(int), vol.Range(min=0, max=300)), None
+            ),
             vol.Optional(CONF_VOLUME): vol.Any(
                 vol.All(vol.Coerce(int), vol.Range(min=1, max=100)), None
             ),
-            vol.Required(ATTR_DEVICE_ID): cv.ensure_list,
+            vol.Optional(CONF_WAIT, default=0): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=300)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(CONF_ALARM_STATE, CONF_CHIME, CONF_ALARM),
+)
+SEND_COMMANDS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(CONF_COMMANDS): vol.All(
+                cv.ensure_list, [COMMAND_STEP_SCHEMA], vol.Length(min=1, max=20)
+            ),
+            **TARGET_SCHEMA,
         }
     ),
-    cv.has_at_least_one_key(ATTR_DEVICE_ID),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, CONF_GROUP),
 )
 
+PROFILE_SERVICE = "profile"
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_SECONDS, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(CONF_CPROFILE, default=False): cv.boolean,
+    }
+)
+
+ONBOARD_SERVICE = "onboard"
+ONBOARD_SCHEMA = vol.Schema({})
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Ring Keypad component."""
+    conf = config.get(DOMAIN) or {}
+    stream = KeypadEventStream(hass)
+    hass.data[DATA_STREAM] = stream
+    hass.data[DATA_KEYPADS] = {}
+    dispatcher = CommandDispatcher(
+        hass,
+        idempotency_window=conf.get(
+            CONF_IDEMPOTENCY_WINDOW, DEFAULT_IDEMPOTENCY_WINDOW
+        ),
+        controller_concurrency=conf.get(
+            CONF_CONTROLLER_CONCURRENCY, DEFAULT_CONCURRENCY
+        ),
+        stream=stream,
+    )
+    hass.data[DATA_DISPATCHER] = dispatcher
+    if refresh_interval := conf.get(CONF_REFRESH_INTERVAL):
+        refresher = StateRefresher(hass, dispatcher, refresh_interval)
+        hass.data[DATA_REFRESHER] = refresher
+        stop_refresh = refresher.async_start()
+
+        @callback
+        def async_stop_refresh(event: Event) -> None:
+            """Stop refreshing keypads when Home Assistant stops."""
+            stop_refresh()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_refresh)
+    groups = KeypadGroups(hass, conf.get(CONF_GROUPS, {}), resolve_zwave_device_ids)
+    hass.data[DATA_GROUPS] = groups
+    hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, groups.async_invalidate)
+    hass.bus.async_listen(
+        dr.EVENT_DEVICE_REGISTRY_UPDATED, dispatcher.async_invalidate_controllers
+    )
+
+    websocket_api.async_setup(hass)
+    metrics.async_setup(hass)
+
     _LOGGER.debug("Registering Ring Keypad services")
     hass.services.async_register(
         DOMAIN,
@@ -95,41 +269,81 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         _async_alarm_service,
         ALARM_SCHEMA,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SEND_COMMANDS_SERVICE,
+        _async_send_commands_service,
+        SEND_COMMANDS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        PROFILE_SERVICE,
+        _async_profile_service,
+        PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        ONBOARD_SERVICE,
+        _async_onboard_service,
+        ONBOARD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     return True
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up a config entry."""
-    device_registry = dr.async_get(hass)
-    stored_device_id = entry.options[CONF_DEVICE_ID]
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a config entry to the current version."""
+    if entry.version > 1:
+        return False
 
-    if device_registry.async_is_composite_device_id(stored_device_id):
-        split_devices = device_registry.async_get_devices_for_composite_device_id(
-            stored_device_id
+    if entry.minor_version < 2:
+        # One time cleanup from when keypads were helper devices. Resolve
+        # composite device ids and remove any helper devices.
+        device_registry = dr.async_get(hass)
+        stored_device_id = entry.options[CONF_DEVICE_ID]
+        if device_registry.async_is_composite_device_id(stored_device_id):
+            split_devices = device_registry.async_get_devices_for_composite_device_id(
+                stored_device_id
+            )
+            zwave_device = next(
+                (
+                    d
+                    for d in split_devices
+                    if d.config_entry_id
+                    and (
+                        c_entry := hass.config_entries.async_get_entry(
+                            d.config_entry_id
+                        )
+                    )
+                    and c_entry.domain == ZWAVE_DOMAIN
+                ),
+                None,
+            )
+            if zwave_device:
+                stored_device_id = zwave_device.id
+
+        async_remove_helper_devices(
+            hass,
+            helper_config_entry_id=entry.entry_id,
+            source_device_id=stored_device_id,
+            remove_all_devices=True,
         )
-        zwave_device = next(
-            (
-                d
-                for d in split_devices
-                if d.config_entry_id
-                and (c_entry := hass.config_entries.async_get_entry(d.config_entry_id))
-                and c_entry.domain == ZWAVE_DOMAIN
-            ),
-            None,
+        hass.config_entries.async_update_entry(
+            entry,
+            options={**entry.options, CONF_DEVICE_ID: stored_device_id},
+            minor_version=2,
         )
-        if zwave_device:
-            stored_device_id = zwave_device.id
-            hass.config_entries.async_update_entry(
-                entry,
-                options={**entry.options, CONF_DEVICE_ID: zwave_device.id},
-            )
+        _LOGGER.debug("Migrated Ring Keypad configuration entry to version 1.2")
+
+    return True
 
-    async_remove_helper_devices(
-        hass,
-        helper_config_entry_id=entry.entry_id,
-        source_device_id=stored_device_id,
-        remove_all_devices=True,
-    )
+
+async def async_setup_entry(hass: HomeAssistant, entry: RingKeypadConfigEntry) -> bool:
+    """Set up a config entry."""
+    device_registry = dr.async_get(hass)
+    stored_device_id = entry.options[CONF_DEVICE_ID]
 
     try:
         device_entry = device_registry.async_get(stored_device_id)
@@ -157,16 +371,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.debug("Removing Ring Keypad configuration entry")
             await hass.config_entries.async_remove(entry.entry_id)
         elif action == "update":
-            if (changes := event.data.get("changes")) and "name" in changes:
-                _LOGGER.debug("Reloading Ring Keypad configuration entry")
-                await hass.config_entries.async_reload(entry.entry_id)
-
+            changes = event.data.get("changes") or {}
+            if "name" not in changes and "name_by_user" not in changes:
+                return
+            # The entity follows the device name itself, so only the config
+            # entry title needs updating and the entry stays loaded.
+            if (
+                updated_device := device_registry.async_get(event.data["device_id"])
+            ) is None:
+                return
+            entry.runtime_data.device_entry = updated_device
+            title = updated_device.name_by_user or updated_device.name or entry.title
+            _LOGGER.debug("Renaming Ring Keypad configuration entry to %s", title)
+            hass.config_entries.async_update_entry(entry, title=title)
+
+    runtime_data = entry.runtime_data = RingKeypadData(
+        zwave_device_id=device_entry.id, device_entry=device_entry
+    )
+    _async_index_keypad(hass, entry, runtime_data)
     entry.async_on_unload(
         async_track_device_registry_updated_event(
             hass, device_entry.id, async_registry_updated
         )
     )
 
+    entry.async_on_unload(
+        functools.partial(
+            hass.data[DATA_DISPATCHER].async_remove_shadow, device_entry.id
+        )
+    )
+    _async_track_node_status(hass, entry, device_entry.id)
+
     await hass.config_entries.async_forward_entry_setups(
         entry,
         platforms=PLATFORMS,
@@ -174,7 +409,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_unload_entry(hass: HomeAssistant, entry: RingKeypadConfigEntry) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(
         entry,
@@ -182,80 +417,243 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
 
-def _resolve_zwave_device_ids(hass: HomeAssistant, device_ids: list[str]) -> list[str]:
-    """Resolve target device IDs to underlying Z-Wave JS device IDs if needed."""
-    device_registry = dr.async_get(hass)
-    ring_entries = {
-        entry.entry_id: entry.options.get(CONF_DEVICE_ID)
-        for entry in hass.config_entries.async_entries(DOMAIN)
-    }
-    resolved_ids: list[str] = []
-    for dev_id in device_ids:
-        dev_entry = device_registry.async_get(dev_id)
-        if (
-            dev_entry
-            and dev_entry.config_entry_id in ring_entries
-            and (zwave_id := ring_entries[dev_entry.config_entry_id])
-        ):
-            resolved_ids.append(zwave_id)
-        else:
-            resolved_ids.append(dev_id)
-    return resolved_ids
-
-
-async def _zwave_set_value(
-    hass: HomeAssistant,
-    service_data: dict[str, Any],
-    context: Context,
+@callback
+def _async_index_keypad(
+    hass: HomeAssistant, entry: ConfigEntry, runtime_data: RingKeypadData
 ) -> None:
-    if ATTR_DEVICE_ID in service_data:
-        service_data[ATTR_DEVICE_ID] = _resolve_zwave_device_ids(
-            hass, cv.ensure_list(service_data[ATTR_DEVICE_ID])
+    """Index the keypad by its Z-Wave JS device and the devices of its entry."""
+    keypads = hass.data[DATA_KEYPADS]
+    device_ids = [runtime_data.zwave_device_id]
+    device_ids.extend(
+        device.id
+        for device in dr.async_entries_for_config_entry(
+            dr.async_get(hass), entry.entry_id
         )
-    _LOGGER.debug("Sending Z-Wave JS set_value command: %s", service_data)
-    await hass.services.async_call(
-        ZWAVE_DOMAIN,
-        ZWAVE_SET_VALUE,
-        service_data=service_data,
-        blocking=True,
-        context=context,
+        if device.config_entry_id == entry.entry_id
     )
+    for device_id in device_ids:
+        keypads[device_id] = runtime_data
+    # Groups resolved before the keypad was loaded may have its other ids
+    hass.data[DATA_GROUPS].async_invalidate()
 
+    @callback
+    def async_remove_index() -> None:
+        """Forget the keypad once its entry is unloaded."""
+        for device_id in device_ids:
+            if keypads.get(device_id) is runtime_data:
+                del keypads[device_id]
+        hass.data[DATA_GROUPS].async_invalidate()
 
-async def _async_update_alarm_state_service(call: ServiceCall) -> None:
-    """Update the Ring Keypad to reflect the alarm state."""
-    service_data: dict[str, Any] = {
-        **alarm_state_command(call.data[CONF_ALARM_STATE], call.data.get(CONF_DELAY)),
-        ATTR_DEVICE_ID: cv.ensure_list(call.data[ATTR_DEVICE_ID]),
-    }
-    await _zwave_set_value(
-        call.hass,
-        service_data=service_data,
+    entry.async_on_unload(async_remove_index)
+
+
+def _async_track_node_status(
+    hass: HomeAssistant, entry: ConfigEntry, device_id: str
+) -> None:
+    """Follow the Z-Wave JS node status sensor of the keypad, if it is enabled.
+
+    The dispatcher parks commands while the node is asleep or dead.
+    """
+    entity_registry = er.async_get(hass)
+    entity_id = next(
+        (
+            entity.entity_id
+            for entity in er.async_entries_for_device(entity_registry, device_id)
+            if entity.platform == ZWAVE_DOMAIN
+            and entity.domain == Platform.SENSOR
+            and entity.unique_id.endswith(NODE_STATUS_SUFFIX)
+        ),
+        None,
+    )
+    if entity_id is None:
+        _LOGGER.debug("No node status sensor for Ring Keypad %s", device_id)
+        return
+    dispatcher = hass.data[DATA_DISPATCHER]
+
+    @callback
+    def async_update_status(state: State | None) -> None:
+        dispatcher.async_set_node_status(device_id, state.state if state else None)
+
+    @callback
+    def async_state_changed(event: Event[EventStateChangedData]) -> None:
+        async_update_status(event.data["new_state"])
+
+    async_update_status(hass.states.get(entity_id))
+    entry.async_on_unload(
+        async_track_state_change_event(hass, entity_id, async_state_changed)
+    )
+    entry.async_on_unload(
+        functools.partial(dispatcher.async_forget_node_status, device_id)
+    )
+
+
+async def _zwave_set_value(hass: HomeAssistant, request: CommandRequest) -> None:
+    """Send a validated command request to the keypads."""
+    await hass.data[DATA_DISPATCHER].async_send(request)
+
+
+def _target_device_ids(call: ServiceCall) -> tuple[str, ...]:
+    """Return the Z-Wave JS device ids for the devices and groups targeted."""
+    device_ids = resolve_zwave_device_ids(call.hass, call.data.get(ATTR_DEVICE_ID, []))
+    groups = call.hass.data[DATA_GROUPS]
+    for name in call.data.get(CONF_GROUP, []):
+        device_ids.extend(groups.async_resolve(name))
+    if not device_ids:
+        raise ServiceValidationError("No Ring Keypads targeted")
+    return tuple(dict.fromkeys(device_ids))
+
+
+def _command_request(
+    call: ServiceCall,
+    command: dict[str, str | int],
+    alarm_state: str | None = None,
+) -> CommandRequest:
+    """Build a command request for the keypads targeted by the service call."""
+    return CommandRequest(
+        device_ids=_target_device_ids(call),
+        command=command,
         context=call.context,
+        alarm_state=alarm_state,
     )
 
 
+async def _async_update_alarm_state_service(call: ServiceCall) -> None:
+    """Update the Ring Keypad to reflect the alarm state."""
+    alarm_state = call.data[CONF_ALARM_STATE]
+    command = alarm_state_command(alarm_state, call.data.get(CONF_DELAY))
+    request = _command_request(call, command, alarm_state=alarm_state)
+    await call.hass.data[DATA_DISPATCHER].async_send_alarm_state(request)
+
+
 async def _async_chime_service(call: ServiceCall) -> None:
     """Send a chime to the Ring Keypad."""
-    service_data: dict[str, Any] = {
-        ATTR_DEVICE_ID: cv.ensure_list(call.data[ATTR_DEVICE_ID]),
-        **chime_command(call.data[CONF_CHIME], call.data.get(CONF_VOLUME)),
-    }
-    await _zwave_set_value(
-        call.hass,
-        service_data=service_data,
-        context=call.context,
-    )
+    command = chime_command(call.data[CONF_CHIME], call.data.get(CONF_VOLUME))
+    await _zwave_set_value(call.hass, _command_request(call, command))
 
 
 async def _async_alarm_service(call: ServiceCall) -> None:
     """Send an alarm to the Ring Keypad."""
-    service_data: dict[str, Any] = {
-        ATTR_DEVICE_ID: cv.ensure_list(call.data[ATTR_DEVICE_ID]),
-        **alarm_command(call.data[CONF_ALARM], call.data.get(CONF_VOLUME)),
+    command = alarm_command(call.data[CONF_ALARM], call.data.get(CONF_VOLUME))
+    await _zwave_set_value(call.hass, _command_request(call, command))
+
+
+def _step_command(step: dict[str, Any]) -> dict[str, str | int]:
+    """Return the command for a single step of a command sequence."""
+    if CONF_ALARM_STATE in step:
+        return alarm_state_command(step[CONF_ALARM_STATE], step.get(CONF_DELAY))
+    if CONF_CHIME in step:
+        return chime_command(step[CONF_CHIME], step.get(CONF_VOLUME))
+    return alarm_command(step[CONF_ALARM], step.get(CONF_VOLUME))
+
+
+def _step_result(
+    device_id: str, step: int, err: HomeAssistantError | None
+) -> dict[str, Any]:
+    """Return the result of a single step sent to a keypad."""
+    result: dict[str, Any] = {
+        "device_id": device_id,
+        "step": step,
+        "success": err is None,
     }
-    await _zwave_set_value(
-        call.hass,
-        service_data=service_data,
-        context=call.context,
+    # A countdown replaced by a newer alarm state was not sent, but did not fail
+    if isinstance(err, CommandSuperseded):
+        result["superseded"] = True
+    elif err is not None:
+        result["error"] = str(err)
+    return result
+
+
+async def _async_send_commands_service(call: ServiceCall) -> ServiceResponse:
+    """Send a sequence of commands to each Ring Keypad."""
+    commands = [
+        (step[CONF_WAIT], _step_command(step), step.get(CONF_ALARM_STATE))
+        for step in call.data[CONF_COMMANDS]
+    ]
+    device_ids = _target_device_ids(call)
+    dispatcher = call.hass.data[DATA_DISPATCHER]
+    # Each keypad receives the sequence in order, keypads run concurrently
+    pipeline_results = await asyncio.gather(
+        *(
+            dispatcher.async_send_pipeline(
+                [
+                    (
+                        wait,
+                        CommandRequest(
+                            (device_id,), command, call.context, alarm_state
+                        ),
+                    )
+                    for wait, command, alarm_state in commands
+                ]
+            )
+            for device_id in device_ids
+        )
+    )
+    results = [
+        _step_result(device_id, step, err)
+        for device_id, errors in zip(device_ids, pipeline_results, strict=True)
+        for step, err in enumerate(errors)
+    ]
+    if call.return_response:
+        return {"results": results}
+    if failed := [result for result in results if "error" in result]:
+        raise HomeAssistantError(
+            f"Failed to send {len(failed)} of {len(results)} keypad commands: "
+            f"{failed[0]['error']}"
+        )
+    return None
+
+
+async def _async_profile_service(call: ServiceCall) -> ServiceResponse:
+    """Record timings of the keypad hot paths and write a report."""
+    if ProfileSession.is_running():
+        raise ServiceValidationError("A Ring Keypad profile is already running")
+    seconds = call.data[CONF_SECONDS]
+    session = ProfileSession(use_cprofile=call.data[CONF_CPROFILE])
+    session.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stats = session.stop()
+    report = session.report(stats, seconds)
+    path = pathlib.Path(
+        call.hass.config.path(
+            f"{DOMAIN}_profile_{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}.txt"
+        )
+    )
+    await call.hass.async_add_executor_job(path.write_text, report)
+    _LOGGER.info("Wrote Ring Keypad profile to %s", path)
+    if not call.return_response:
+        return None
+    return {
+        "report": str(path),
+        "timings": {name: dataclasses.asdict(stat) for name, stat in stats.items()},
+    }
+
+
+async def _async_onboard_service(call: ServiceCall) -> ServiceResponse:
+    """Add a config entry for every Ring Keypad that does not have one.
+
+    The entries are created together and set up concurrently.
+    """
+    hass = call.hass
+    device_entries = async_unconfigured_keypads(hass)
+    _LOGGER.debug("Onboarding %d Ring Keypads", len(device_entries))
+    results = await asyncio.gather(
+        *(
+            hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": SOURCE_IMPORT},
+                data={CONF_DEVICE_ID: device_entry.id},
+            )
+            for device_entry in device_entries
+        )
     )
+    device_ids = [
+        device_entry.id
+        for device_entry, result in zip(device_entries, results, strict=True)
+        if result["type"] is FlowResultType.CREATE_ENTRY
+    ]
+    _LOGGER.info("Added %d Ring Keypads", len(device_ids))
+    if not call.return_response:
+        return None
+    return {"device_ids": device_ids}
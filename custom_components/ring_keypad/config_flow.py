@@ -6,15 +6,36 @@ from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
+from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.const import CONF_DEVICE_ID
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import selector
 from homeassistant.helpers.schema_config_entry_flow import (
+    SchemaCommonFlowHandler,
     SchemaConfigFlowHandler,
+    SchemaFlowError,
     SchemaFlowFormStep,
 )
 
-from .const import DOMAIN
+from .const import (
+    CONF_COALESCE_PRESSED,
+    CONF_CODE_HASHES,
+    CONF_CODE_LOCKOUT,
+    CONF_CODE_SALT,
+    CONF_KEYPRESS_EVENT,
+    CONF_MAX_CODE_ATTEMPTS,
+    CONF_STATE_WRITES,
+    CONF_SUPPRESS_EVENTS,
+    CONF_VALID_CODES,
+    CONF_VERIFY_CODES,
+    DOMAIN,
+    STATE_WRITES_ALL,
+    STATE_WRITES_OFF,
+    STATE_WRITES_RATE_LIMITED,
+)
+from .lockout import DEFAULT_LOCKOUT
+from .model import KEYAD_EVENTS
+from .verifier import CodeVerifier
 
 CONFIG_FLOW = {
     "user": SchemaFlowFormStep(
@@ -28,8 +49,86 @@ CONFIG_FLOW = {
     )
 }
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_SUPPRESS_EVENTS, default=[]): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[name for name, _, _ in KEYAD_EVENTS],
+                multiple=True,
+                translation_key="button",
+            )
+        ),
+        vol.Optional(CONF_COALESCE_PRESSED, default=0): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=10,
+                step=0.5,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_MAX_CODE_ATTEMPTS, default=0): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0, max=20, step=1, mode=selector.NumberSelectorMode.BOX
+            )
+        ),
+        vol.Optional(
+            CONF_CODE_LOCKOUT, default=DEFAULT_LOCKOUT
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=30,
+                max=3600,
+                step=30,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_VERIFY_CODES, default=False): selector.BooleanSelector(),
+        # Only the salted hashes of the codes are stored in the options
+        vol.Optional(CONF_VALID_CODES): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.PASSWORD, multiple=True
+            )
+        ),
+        vol.Optional(CONF_KEYPRESS_EVENT, default=False): selector.BooleanSelector(),
+        vol.Optional(
+            CONF_STATE_WRITES, default=STATE_WRITES_ALL
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[
+                    STATE_WRITES_ALL,
+                    STATE_WRITES_RATE_LIMITED,
+                    STATE_WRITES_OFF,
+                ],
+                translation_key="state_writes",
+            )
+        ),
+    }
+)
+
+
+async def validate_options(
+    handler: SchemaCommonFlowHandler, user_input: dict[str, Any]
+) -> dict[str, Any]:
+    """Replace the entered valid codes with their salted hashes."""
+    codes = [code for code in user_input.pop(CONF_VALID_CODES, []) if code]
+    if not user_input.get(CONF_VERIFY_CODES):
+        handler.options.pop(CONF_CODE_SALT, None)
+        handler.options.pop(CONF_CODE_HASHES, None)
+        return user_input
+    if any(not code.isdigit() for code in codes):
+        raise SchemaFlowError("invalid_code")
+    if codes:
+        verifier = CodeVerifier.from_codes(codes)
+        user_input[CONF_CODE_SALT] = verifier.salt
+        user_input[CONF_CODE_HASHES] = sorted(verifier.hashes)
+    elif not handler.options.get(CONF_CODE_HASHES):
+        raise SchemaFlowError("valid_codes_required")
+    return user_input
+
+
 OPTIONS_FLOW = {
-    "init": SchemaFlowFormStep(),
+    "init": SchemaFlowFormStep(OPTIONS_SCHEMA, validate_user_input=validate_options),
 }
 
 
@@ -38,9 +137,15 @@ class RingKeypadConfigFlowHandler(SchemaConfigFlowHandler, domain=DOMAIN):
 
     config_flow = CONFIG_FLOW
     options_flow = OPTIONS_FLOW
+    options_flow_reloads = True
 
     VERSION = 1
-    MINOR_VERSION = 1
+    MINOR_VERSION = 2
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> ConfigFlowResult:
+        """Create an entry for a keypad found by the onboard service."""
+        self._async_abort_entries_match({CONF_DEVICE_ID: import_data[CONF_DEVICE_ID]})
+        return self.async_create_entry({CONF_DEVICE_ID: import_data[CONF_DEVICE_ID]})
 
     def async_config_entry_title(self, options: Mapping[str, Any]) -> str:
         """Return config entry title."""
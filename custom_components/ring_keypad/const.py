@@ -1,4 +1,28 @@
 """Constants for Ring Keypad."""
 
+from typing import Any
+
+from homeassistant.util.signal_type import SignalType
+
 DOMAIN = "ring_keypad"
 DEFAULT_DELAY = 60
+
+CONF_SUPPRESS_EVENTS = "suppress_events"
+CONF_COALESCE_PRESSED = "coalesce_pressed"
+CONF_MAX_CODE_ATTEMPTS = "max_code_attempts"
+CONF_CODE_LOCKOUT = "code_lockout"
+CONF_VERIFY_CODES = "verify_codes"
+CONF_VALID_CODES = "valid_codes"
+CONF_CODE_SALT = "code_salt"
+CONF_CODE_HASHES = "code_hashes"
+CONF_KEYPRESS_EVENT = "keypress_event"
+CONF_STATE_WRITES = "state_writes"
+
+STATE_WRITES_ALL = "all"
+STATE_WRITES_RATE_LIMITED = "rate_limited"
+STATE_WRITES_OFF = "off"
+
+# Dispatcher signal sent for every decoded keypress when the keypress event
+# option is enabled. Unlike a bus event it is never seen by the recorder, so
+# entered codes are not stored.
+SIGNAL_KEYPRESS: SignalType[dict[str, Any]] = SignalType(f"{DOMAIN}_keypress")
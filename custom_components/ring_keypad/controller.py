@@ -0,0 +1,170 @@
+"""Per Z-Wave JS controller queues for commands to Ring Keypads."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import enum
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Sequence
+
+from homeassistant.core import HomeAssistant
+
+# Commands sent to a single controller at the same time
+DEFAULT_CONCURRENCY = 2
+# Upper bounds in seconds of the command latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Priority(enum.IntEnum):
+    """Priority lanes of a controller queue, lowest value first."""
+
+    ALARM_STATE = 0
+    COMMAND = 1
+    REFRESH = 2
+
+
+class KeypadWait:
+    """Time commands to one keypad spent waiting for the controller."""
+
+    __slots__ = ("commands", "max_wait", "wait_time")
+
+    def __init__(self) -> None:
+        """Initialize KeypadWait."""
+        self.commands = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        """Record the wait of one command."""
+        self.commands += 1
+        self.wait_time += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class LatencyHistogram:
+    """Counts of command latencies in fixed buckets."""
+
+    __slots__ = ("count", "counts", "sum")
+
+    def __init__(self) -> None:
+        """Initialize LatencyHistogram."""
+        # One count per bucket, with the last for latencies over every bucket
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of one command in seconds."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.count += 1
+        self.sum += latency
+
+
+class ControllerQueue:
+    """Schedules the commands sent through one Z-Wave JS controller.
+
+    Each controller has its own queue so a congested or restarting controller
+    does not delay commands to keypads on another Z-Wave network.
+
+    When the controller is at its concurrency limit, waiting commands are
+    queued by priority lane and then by the keypads they target. Lanes are
+    served strictly in priority order, and within a lane the keypads take
+    turns one command at a time, so a keypad flooded with commands does not
+    hold up the other keypads on the controller.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        controller_id: str | None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        """Initialize ControllerQueue."""
+        self._hass = hass
+        self._concurrency = concurrency
+        self._active = 0
+        self._lanes: tuple[
+            OrderedDict[tuple[str, ...], deque[asyncio.Future[None]]], ...
+        ] = tuple(OrderedDict() for _ in Priority)
+        # The zwave_js config entry id, or None for devices not in the registry
+        self.controller_id = controller_id
+        self.commands_sent = 0
+        self.failures = 0
+        self.queued = 0
+        self.wait_time = 0.0
+        self.keypads: dict[str, KeypadWait] = {}
+        self.latency = LatencyHistogram()
+
+    async def async_run(
+        self,
+        send: Callable[[], Awaitable[None]],
+        device_ids: Sequence[str] = (),
+        priority: Priority = Priority.COMMAND,
+    ) -> None:
+        """Send a command to keypads once it is their turn on the controller."""
+        start = self._hass.loop.time()
+        if self._active < self._concurrency and not self.queued:
+            self._active += 1
+        else:
+            await self._async_wait(tuple(device_ids), priority)
+        wait = self._hass.loop.time() - start
+        self.wait_time += wait
+        for device_id in device_ids:
+            if (keypad := self.keypads.get(device_id)) is None:
+                keypad = self.keypads[device_id] = KeypadWait()
+            keypad.record(wait)
+        sent = self._hass.loop.time()
+        try:
+            await send()
+        except Exception:
+            self.failures += 1
+            raise
+        else:
+            self.commands_sent += 1
+        finally:
+            self.latency.observe(self._hass.loop.time() - sent)
+            self._release()
+
+    async def _async_wait(self, flow: tuple[str, ...], priority: Priority) -> None:
+        """Wait until a command is given a slot on the controller."""
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        lane = self._lanes[priority]
+        if (waiters := lane.get(flow)) is None:
+            waiters = lane[flow] = deque()
+        waiters.append(future)
+        self.queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was given to this command just before it was cancelled
+                self._release()
+            elif future in waiters:
+                # A finished command may already have skipped this one
+                self.queued -= 1
+                waiters.remove(future)
+                if not waiters and lane.get(flow) is waiters:
+                    del lane[flow]
+            raise
+
+    def _release(self) -> None:
+        """Give a finished command's slot to the next waiting command."""
+        for lane in self._lanes:
+            while lane:
+                flow, waiters = next(iter(lane.items()))
+                future = waiters.popleft()
+                self.queued -= 1
+                if future.done():
+                    # Cancelled before its task could leave the queue
+                    if not waiters:
+                        del lane[flow]
+                    continue
+                if waiters:
+                    # The keypads go to the back of the lane until their next turn
+                    lane.move_to_end(flow)
+                else:
+                    del lane[flow]
+                future.set_result(None)
+                return
+        self._active -= 1
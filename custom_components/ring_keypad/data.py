@@ -0,0 +1,48 @@
+"""Runtime data for Ring Keypad config entries."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .profiler import timed
+
+if TYPE_CHECKING:
+    from .event import RingKeypadEventEntity
+
+
+@dataclasses.dataclass(slots=True)
+class RingKeypadData:
+    """State for a loaded keypad, updated only by device registry events."""
+
+    # The Z-Wave JS device id that commands are sent to
+    zwave_device_id: str
+    device_entry: dr.DeviceEntry
+    # Set once the event platform has added the keypad's event entity
+    entity: RingKeypadEventEntity | None = None
+
+
+type RingKeypadConfigEntry = ConfigEntry[RingKeypadData]
+
+# Runtime data of loaded keypads by device id, so service calls resolve their
+# targets without device registry or config entry lookups
+DATA_KEYPADS: HassKey[dict[str, RingKeypadData]] = HassKey(f"{DOMAIN}_keypads")
+
+
+@timed("resolve_device_ids")
+def resolve_zwave_device_ids(hass: HomeAssistant, device_ids: list[str]) -> list[str]:
+    """Resolve target device IDs to underlying Z-Wave JS device IDs if needed."""
+    keypads = hass.data[DATA_KEYPADS]
+    resolved_ids: list[str] = []
+    for dev_id in device_ids:
+        if keypad := keypads.get(dev_id):
+            resolved_ids.append(keypad.zwave_device_id)
+        else:
+            resolved_ids.append(dev_id)
+    return resolved_ids
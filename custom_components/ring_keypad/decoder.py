@@ -0,0 +1,95 @@
+"""Decoding of Z-Wave JS Entry Control notifications from Ring Keypads."""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from collections import Counter
+from typing import Any
+
+from .model import KEYAD_EVENTS
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_EVENT_TYPE = "event_type"
+CONF_EVENT_DATA = "event_data"
+CONF_SEQUENCE_NUMBER = "sequence_number"
+
+# Maximum number of distinct unknown event types counted
+MAX_UNKNOWN_EVENT_TYPES = 32
+
+# Entry Control event type to the keypad event name and entity event type
+DECODE_TABLE: dict[int, tuple[str, str]] = {
+    keypad_event_type: (name, entity_event_type)
+    for name, keypad_event_type, entity_event_type in KEYAD_EVENTS
+}
+ENTITY_EVENT_TYPES = sorted(
+    {entity_event_type for _, entity_event_type in DECODE_TABLE.values()}
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class KeypadEvent:
+    """A decoded keypad notification.
+
+    Retransmits of a notification decode to equal events.
+    """
+
+    # Entry Control event type from the notification
+    event_type: int
+    # Keypad event name, such as code_entered
+    button: str
+    # Event entity event type, such as alarm_disarm
+    entity_event_type: str
+    code: str | None = None
+    sequence_number: int | None = None
+
+
+class KeypadDecoder:
+    """Decodes Entry Control notifications into keypad events.
+
+    Unknown event types are counted instead of logged on every notification.
+    """
+
+    __slots__ = (
+        "_max_unknown",
+        "events_decoded",
+        "events_unknown",
+        "unknown_event_types",
+    )
+
+    def __init__(self, max_unknown: int = MAX_UNKNOWN_EVENT_TYPES) -> None:
+        """Initialize KeypadDecoder."""
+        self._max_unknown = max_unknown
+        self.unknown_event_types: Counter[Any] = Counter()
+        self.events_decoded = 0
+        self.events_unknown = 0
+
+    def decode(self, event_data: dict[str, Any]) -> KeypadEvent | None:
+        """Return the keypad event for a notification, or None if unknown."""
+        if (event_type := event_data.get(CONF_EVENT_TYPE)) is None:
+            return None
+        if (decoded := DECODE_TABLE.get(event_type)) is None:
+            self.events_unknown += 1
+            self._count_unknown(event_type)
+            return None
+        self.events_decoded += 1
+        return KeypadEvent(
+            event_type,
+            *decoded,
+            code=event_data.get(CONF_EVENT_DATA),
+            sequence_number=event_data.get(CONF_SEQUENCE_NUMBER),
+        )
+
+    def _count_unknown(self, event_type: Any) -> None:
+        """Count an unknown event type, logging the first time it is seen."""
+        if event_type in self.unknown_event_types:
+            self.unknown_event_types[event_type] += 1
+            return
+        if len(self.unknown_event_types) >= self._max_unknown:
+            return
+        _LOGGER.info(
+            "Ring Keypad received ZWave notification with unknown event type: %s",
+            event_type,
+        )
+        self.unknown_event_types[event_type] = 1
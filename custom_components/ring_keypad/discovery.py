@@ -0,0 +1,49 @@
+"""Discovery of Ring Keypads on Z-Wave JS networks."""
+
+from __future__ import annotations
+
+from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN
+from .dispatch import ZWAVE_DOMAIN
+
+RING_MANUFACTURER = "Ring"
+# Z-Wave JS device labels of the Ring Keypad v2
+KEYPAD_V2_MODELS = frozenset({"4AK1SZ"})
+# Product description of the Ring Keypad v2 in the Z-Wave JS device database
+KEYPAD_V2_DESCRIPTION = "keypad v2"
+
+
+def is_keypad_v2(device_entry: dr.DeviceEntry) -> bool:
+    """Return True if the device is a Ring Keypad v2."""
+    if device_entry.manufacturer != RING_MANUFACTURER:
+        return False
+    return any(
+        model in KEYPAD_V2_MODELS or model.casefold().startswith(KEYPAD_V2_DESCRIPTION)
+        for model in (device_entry.model, device_entry.model_id)
+        if model
+    )
+
+
+@callback
+def async_unconfigured_keypads(hass: HomeAssistant) -> list[dr.DeviceEntry]:
+    """Return the Ring Keypad v2 devices that do not have a config entry.
+
+    Devices are found through the device registry index of each Z-Wave JS
+    config entry rather than a scan of every device.
+    """
+    configured = {
+        entry.options.get(CONF_DEVICE_ID)
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    device_registry = dr.async_get(hass)
+    keypads: dict[str, dr.DeviceEntry] = {}
+    for zwave_entry in hass.config_entries.async_entries(ZWAVE_DOMAIN):
+        for device_entry in dr.async_entries_for_config_entry(
+            device_registry, zwave_entry.entry_id
+        ):
+            if device_entry.id not in configured and is_keypad_v2(device_entry):
+                keypads[device_entry.id] = device_entry
+    return list(keypads.values())
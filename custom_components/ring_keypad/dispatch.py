@@ -0,0 +1,497 @@
+"""Dispatch of Z-Wave JS commands to Ring Keypads."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import functools
+import logging
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping, Sequence
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import Context, Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .controller import DEFAULT_CONCURRENCY, ControllerQueue, Priority
+from .model import ALARM_SOUND_STATES, COUNTDOWN_STATES
+from .profiler import timed
+from .stream import KeypadEventStream
+
+_LOGGER = logging.getLogger(__name__)
+
+ZWAVE_DOMAIN = "zwave_js"
+ZWAVE_SET_VALUE = "set_value"
+
+DEFAULT_IDEMPOTENCY_WINDOW = 0.5
+MAX_CACHE_ENTRIES = 128
+
+# Z-Wave JS node statuses where commands would wait for a timeout
+NOT_READY_STATUSES = frozenset({"asleep", "dead"})
+# Parked slot for alarm state commands, other commands are parked by property
+PARKED_ALARM_STATE = "alarm_state"
+
+# Sorted device ids and sorted command items of a command
+type CommandKey = tuple[tuple[str, ...], tuple[tuple[str, str | int], ...]]
+
+DATA_DISPATCHER: HassKey[CommandDispatcher] = HassKey(f"{DOMAIN}_dispatcher")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CommandRequest:
+    """A validated command for one or more keypads."""
+
+    # Resolved Z-Wave JS device ids of the target keypads
+    device_ids: tuple[str, ...]
+    command: Mapping[str, str | int]
+    context: Context | None = None
+    # The alarm state shown by the command, if it is an alarm state update
+    alarm_state: str | None = None
+    # True when resending the shadow state of a keypad
+    refresh: bool = False
+
+    @property
+    def priority(self) -> Priority:
+        """Return the priority lane of the command on the controller."""
+        if self.refresh:
+            return Priority.REFRESH
+        if self.alarm_state is not None:
+            return Priority.ALARM_STATE
+        return Priority.COMMAND
+
+    @property
+    def key(self) -> CommandKey:
+        """Return a key identifying identical commands to the same keypads."""
+        return (tuple(sorted(self.device_ids)), tuple(sorted(self.command.items())))
+
+
+class CommandSuperseded(HomeAssistantError):
+    """A countdown was superseded by a newer alarm state before it was sent."""
+
+
+class _CacheEntry:
+    """A command that is in flight or recently completed."""
+
+    __slots__ = ("expires", "future")
+
+    def __init__(self, future: asyncio.Future[None]) -> None:
+        """Initialize _CacheEntry."""
+        self.future = future
+        self.expires: float | None = None
+
+
+class ShadowState:
+    """The alarm state command a keypad is expected to be showing."""
+
+    __slots__ = ("command", "confirmed")
+
+    def __init__(self, command: Mapping[str, str | int]) -> None:
+        """Initialize ShadowState."""
+        self.command = command
+        # Loop time the command was last acknowledged by the keypad node
+        self.confirmed: float | None = None
+
+
+class CommandDispatcher:
+    """Sends commands to keypads through Z-Wave JS.
+
+    Identical commands to the same devices within the idempotency window share
+    the result of the in flight or most recently completed command instead of
+    sending another frame to the keypad.
+
+    Commands are sent through a separate queue for the Z-Wave JS controller
+    of each keypad, so one Z-Wave network does not hold up another.
+
+    Commands to keypads whose node is asleep or dead are parked rather than
+    sent, and flushed when the node is ready again. Only the latest alarm
+    state and the latest command for each other property are kept.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        idempotency_window: float = DEFAULT_IDEMPOTENCY_WINDOW,
+        max_entries: int = MAX_CACHE_ENTRIES,
+        controller_concurrency: int = DEFAULT_CONCURRENCY,
+        stream: KeypadEventStream | None = None,
+    ) -> None:
+        """Initialize CommandDispatcher."""
+        self._hass = hass
+        self._stream = stream
+        self._controller_concurrency = controller_concurrency
+        self._device_controllers: dict[str, str | None] = {}
+        self.controllers: dict[str | None, ControllerQueue] = {}
+        self._idempotency_window = idempotency_window
+        self._max_entries = max_entries
+        self._cache: OrderedDict[CommandKey, _CacheEntry] = OrderedDict()
+        self._countdowns: dict[str, asyncio.Task[None]] = {}
+        self._in_flight = 0
+        self._node_status: dict[str, str] = {}
+        self._parked: dict[str, dict[Hashable, CommandRequest]] = {}
+        self.shadow: dict[str, ShadowState] = {}
+        self.commands_sent = 0
+        self.commands_parked = 0
+        self.idempotent_hits = 0
+        self.countdowns_superseded = 0
+
+    def is_ready(self, device_id: str) -> bool:
+        """Return True if commands can be sent to the keypad node now."""
+        return self._node_status.get(device_id) not in NOT_READY_STATUSES
+
+    @callback
+    def async_set_node_status(self, device_id: str, status: str | None) -> None:
+        """Update the Z-Wave JS node status of a keypad.
+
+        Parked commands are flushed in the background once the node is ready.
+        """
+        if status is None:
+            self._node_status.pop(device_id, None)
+        else:
+            self._node_status[device_id] = status
+        if not self.is_ready(device_id):
+            return
+        if parked := self._parked.pop(device_id, None):
+            _LOGGER.debug("Flushing %d parked commands to %s", len(parked), device_id)
+            self._hass.async_create_background_task(
+                self._async_flush(device_id, list(parked.values())),
+                f"{DOMAIN} flush {device_id}",
+            )
+
+    @callback
+    def async_forget_node_status(self, device_id: str) -> None:
+        """Stop following the node status of a keypad that is being unloaded.
+
+        Parked commands are kept, since the node is not known to be ready, and
+        are flushed by the next status update once the keypad is loaded again.
+        """
+        self._node_status.pop(device_id, None)
+
+    async def _async_flush(
+        self, device_id: str, requests: list[CommandRequest]
+    ) -> None:
+        """Send the commands parked while a keypad node was not ready."""
+        for request in requests:
+            try:
+                if request.alarm_state is not None:
+                    await self.async_send_alarm_state(request)
+                else:
+                    await self.async_send(request)
+            except HomeAssistantError as err:
+                _LOGGER.warning(
+                    "Failed to send parked command to keypad %s: %s", device_id, err
+                )
+
+    def _park(self, request: CommandRequest) -> CommandRequest | None:
+        """Park the command for keypads that are not ready.
+
+        Returns the request for the remaining keypads, or None if there are none.
+        """
+        if all(self.is_ready(device_id) for device_id in request.device_ids):
+            return request
+        slot = (
+            PARKED_ALARM_STATE
+            if request.alarm_state is not None
+            else request.command.get("property")
+        )
+        ready: list[str] = []
+        for device_id in request.device_ids:
+            if self.is_ready(device_id):
+                ready.append(device_id)
+                continue
+            _LOGGER.debug("Parking command for %s until it is ready", device_id)
+            self.commands_parked += 1
+            parked = self._parked.setdefault(device_id, {})
+            # Latest command wins and moves to the end of the flush order
+            parked.pop(slot, None)
+            parked[slot] = dataclasses.replace(request, device_ids=(device_id,))
+        if not ready:
+            return None
+        return dataclasses.replace(request, device_ids=tuple(ready))
+
+    async def async_send_alarm_state(
+        self, request: CommandRequest, *, wait: bool = False
+    ) -> None:
+        """Send an alarm state update to the keypads.
+
+        Any exit or entry delay countdown still being sent to the same keypads
+        is superseded and cancelled, so the new state is not stuck behind it.
+        Countdown commands are sent in the background and return immediately
+        so that a following state change is not queued behind them, and a
+        failure to send them is logged. With wait set, the countdowns are
+        awaited instead, raising CommandSuperseded if one was superseded.
+
+        The expected state of each keypad is recorded as its shadow state,
+        except for countdowns which would restart and alarms which would sound
+        again if they were sent again.
+        """
+        for device_id in request.device_ids:
+            if (task := self._countdowns.pop(device_id, None)) and not task.done():
+                _LOGGER.debug("Superseding countdown command for %s", device_id)
+                self.countdowns_superseded += 1
+                task.cancel()
+
+        if request.alarm_state in ALARM_SOUND_STATES:
+            for device_id in request.device_ids:
+                self.shadow.pop(device_id, None)
+            await self.async_send(request)
+            return
+
+        if request.alarm_state not in COUNTDOWN_STATES:
+            shadows = [ShadowState(request.command) for _ in request.device_ids]
+            self.shadow.update(zip(request.device_ids, shadows, strict=True))
+            await self.async_send(request)
+            confirmed = self._hass.loop.time()
+            for device_id, shadow in zip(request.device_ids, shadows, strict=True):
+                if self.is_ready(device_id):
+                    shadow.confirmed = confirmed
+            return
+
+        tasks: list[asyncio.Task[None]] = []
+        for device_id in request.device_ids:
+            self.shadow.pop(device_id, None)
+            device_request = dataclasses.replace(request, device_ids=(device_id,))
+            task = self._hass.async_create_background_task(
+                self.async_send(device_request),
+                f"{DOMAIN} countdown {device_id}",
+            )
+            self._countdowns[device_id] = task
+            task.add_done_callback(
+                functools.partial(self._async_countdown_done, device_id, not wait)
+            )
+            tasks.append(task)
+        if not wait or not tasks:
+            return
+        await asyncio.wait(tasks)
+        for task in tasks:
+            if not task.cancelled() and (err := task.exception()):
+                raise err
+        if any(task.cancelled() for task in tasks):
+            raise CommandSuperseded("Superseded by a newer alarm state")
+
+    @callback
+    def _async_countdown_done(
+        self, device_id: str, log_failure: bool, task: asyncio.Task[None]
+    ) -> None:
+        """Clean up after a countdown command completes."""
+        if self._countdowns.get(device_id) is task:
+            del self._countdowns[device_id]
+        if not task.cancelled() and (err := task.exception()) and log_failure:
+            _LOGGER.warning("Failed to send countdown to keypad %s: %s", device_id, err)
+
+    @timed("dispatch")
+    async def async_send(self, request: CommandRequest) -> None:
+        """Send a command to the Z-Wave JS devices."""
+        if (parked_request := self._park(request)) is None:
+            return
+        request = parked_request
+        if not self._idempotency_window:
+            await self._async_set_value(request)
+            return
+
+        key = request.key
+        if (entry := self._cache.get(key)) is not None:
+            if entry.expires is None or self._hass.loop.time() < entry.expires:
+                self._cache.move_to_end(key)
+                self.idempotent_hits += 1
+                _LOGGER.debug("Reusing result of identical command: %s", request)
+                await asyncio.shield(entry.future)
+                return
+            del self._cache[key]
+
+        self._evict_superseded(request)
+        entry = _CacheEntry(self._hass.loop.create_future())
+        self._cache[key] = entry
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+        try:
+            await self._async_set_value(request)
+        except BaseException as err:
+            # Failures are shared with waiting callers but never cached
+            if self._cache.get(key) is entry:
+                del self._cache[key]
+            if isinstance(err, asyncio.CancelledError):
+                entry.future.cancel()
+            else:
+                entry.future.set_exception(err)
+                entry.future.exception()
+            raise
+        entry.expires = self._hass.loop.time() + self._idempotency_window
+        entry.future.set_result(None)
+
+    def _evict_superseded(self, request: CommandRequest) -> None:
+        """Forget other commands to the same keypads once a new one is sent.
+
+        A cached command is only identical while nothing else was sent to the
+        keypads since, otherwise disarmed, armed and disarmed again within the
+        window would leave the keypads showing armed.
+        """
+        device_ids, command = request.key
+        superseded = [
+            key
+            for key in self._cache
+            if key[1] != command and not set(device_ids).isdisjoint(key[0])
+        ]
+        for key in superseded:
+            del self._cache[key]
+
+    async def async_send_pipeline(
+        self, steps: Sequence[tuple[float, CommandRequest]]
+    ) -> list[HomeAssistantError | None]:
+        """Send a sequence of commands, each after a wait in seconds.
+
+        Each step is scheduled relative to the start of the pipeline so slow
+        commands do not push back the timing of later steps. A failed step does
+        not stop the pipeline, and the error for each step is returned.
+
+        Alarm state steps are sent like any other alarm state update, so they
+        record the shadow state and exit or entry delays can be superseded.
+        The pipeline waits for each countdown to be sent before the next step,
+        and a superseded countdown returns CommandSuperseded as its result.
+        """
+        results: list[HomeAssistantError | None] = []
+        target = self._hass.loop.time()
+        for wait, request in steps:
+            target += wait
+            if (remaining := target - self._hass.loop.time()) > 0:
+                await asyncio.sleep(remaining)
+            try:
+                if request.alarm_state is not None:
+                    await self.async_send_alarm_state(request, wait=True)
+                else:
+                    await self.async_send(request)
+            except HomeAssistantError as err:
+                _LOGGER.debug("Failed to send pipelined command %s: %s", request, err)
+                results.append(err)
+            else:
+                results.append(None)
+        return results
+
+    @callback
+    def async_remove_shadow(self, device_id: str) -> None:
+        """Stop refreshing a keypad that is no longer loaded."""
+        self.shadow.pop(device_id, None)
+
+    @property
+    def busy(self) -> bool:
+        """Return True while any command is being sent to the keypads."""
+        return self._in_flight > 0
+
+    async def async_refresh(self, device_id: str) -> None:
+        """Send the shadow state to a keypad again.
+
+        The command bypasses the idempotency window since it is only sent to
+        correct a keypad that may have missed the original command.
+        """
+        if (shadow := self.shadow.get(device_id)) is None or not self.is_ready(
+            device_id
+        ):
+            return
+        await self._async_set_value(
+            CommandRequest((device_id,), shadow.command, refresh=True)
+        )
+        if self.shadow.get(device_id) is shadow:
+            shadow.confirmed = self._hass.loop.time()
+
+    @callback
+    def async_invalidate_controllers(self, event: Event | None = None) -> None:
+        """Forget the controllers of devices when the device registry changes."""
+        self._device_controllers.clear()
+
+    def _find_controller(self, device_id: str) -> str | None:
+        """Return the Z-Wave JS config entry id that owns a device."""
+        if (device_entry := dr.async_get(self._hass).async_get(device_id)) is None:
+            return None
+        for config_entry_id in device_entry.config_entries:
+            config_entry = self._hass.config_entries.async_get_entry(config_entry_id)
+            if config_entry is not None and config_entry.domain == ZWAVE_DOMAIN:
+                return config_entry_id
+        return None
+
+    def _controller_queue(self, device_id: str) -> ControllerQueue:
+        """Return the queue for the Z-Wave JS controller of a device."""
+        if device_id in self._device_controllers:
+            controller_id = self._device_controllers[device_id]
+        else:
+            controller_id = self._find_controller(device_id)
+            self._device_controllers[device_id] = controller_id
+        if (queue := self.controllers.get(controller_id)) is None:
+            queue = ControllerQueue(
+                self._hass, controller_id, self._controller_concurrency
+            )
+            self.controllers[controller_id] = queue
+        return queue
+
+    @timed("zwave_set_value")
+    async def _async_set_value(self, request: CommandRequest) -> None:
+        """Send a Z-Wave JS set_value command through each controller's queue."""
+        partitions: dict[ControllerQueue, list[str]] = {}
+        for device_id in request.device_ids:
+            partitions.setdefault(self._controller_queue(device_id), []).append(
+                device_id
+            )
+        self.commands_sent += 1
+        self._in_flight += 1
+        try:
+            if len(partitions) == 1:
+                ((queue, device_ids),) = partitions.items()
+                await queue.async_run(
+                    functools.partial(self._async_call_set_value, request, device_ids),
+                    device_ids,
+                    request.priority,
+                )
+                return
+            results = await asyncio.gather(
+                *(
+                    queue.async_run(
+                        functools.partial(
+                            self._async_call_set_value, request, device_ids
+                        ),
+                        device_ids,
+                        request.priority,
+                    )
+                    for queue, device_ids in partitions.items()
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            self._in_flight -= 1
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _async_call_set_value(
+        self, request: CommandRequest, device_ids: list[str]
+    ) -> None:
+        """Call the Z-Wave JS set_value service for devices on one controller."""
+        service_data = {**request.command, ATTR_DEVICE_ID: device_ids}
+        _LOGGER.debug("Sending Z-Wave JS set_value command: %s", service_data)
+        if (stream := self._stream) is None or not stream.has_subscribers:
+            await self._hass.services.async_call(
+                ZWAVE_DOMAIN,
+                ZWAVE_SET_VALUE,
+                service_data=service_data,
+                blocking=True,
+                context=request.context,
+            )
+            return
+        start = self._hass.loop.time()
+        try:
+            await self._hass.services.async_call(
+                ZWAVE_DOMAIN,
+                ZWAVE_SET_VALUE,
+                service_data=service_data,
+                blocking=True,
+                context=request.context,
+            )
+        except HomeAssistantError as err:
+            stream.async_publish_command(
+                device_ids, request.command, self._hass.loop.time() - start, err
+            )
+            raise
+        stream.async_publish_command(
+            device_ids, request.command, self._hass.loop.time() - start
+        )
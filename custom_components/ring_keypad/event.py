@@ -1,54 +1,142 @@
 """Event entity platform for Ring Keypad."""
 
+from __future__ import annotations
+
+import functools
 import logging
+from collections.abc import Callable
 from typing import Any
 
 from homeassistant.components.event import EventDeviceClass, EventEntity
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_DEVICE_ID
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util.hass_dict import HassKey
 
-from .model import KEYAD_EVENTS
+from .const import (
+    CONF_COALESCE_PRESSED,
+    CONF_CODE_HASHES,
+    CONF_CODE_LOCKOUT,
+    CONF_CODE_SALT,
+    CONF_KEYPRESS_EVENT,
+    CONF_MAX_CODE_ATTEMPTS,
+    CONF_STATE_WRITES,
+    CONF_SUPPRESS_EVENTS,
+    DOMAIN,
+    SIGNAL_KEYPRESS,
+    STATE_WRITES_ALL,
+    STATE_WRITES_OFF,
+    STATE_WRITES_RATE_LIMITED,
+)
+from .data import RingKeypadConfigEntry
+from .decoder import CONF_EVENT_TYPE, ENTITY_EVENT_TYPES, KeypadDecoder, KeypadEvent
+from .dispatch import DATA_DISPATCHER, CommandRequest
+from .lockout import DEFAULT_LOCKOUT, CodeAttemptLimiter
+from .model import chime_command
+from .profiler import timed
+from .stream import DATA_STREAM
+from .verifier import CodeVerifier
 
 _LOGGER = logging.getLogger(__name__)
 
 ZWAVE_NOTIFICATION = "zwave_js_notification"
-CONF_EVENT_TYPE = "event_type"
-CONF_EVENT_DATA = "event_data"
+PRESSED_EVENT_TYPE = "pressed"
+
+# Retransmitted notifications that decode to the same event inside this window
+# are dropped as duplicates.
+DEDUP_WINDOW = 1.0
+
+# Minimum seconds between pressed event state writes when they are rate limited
+STATE_WRITE_INTERVAL = 1.0
+
+DATA_NOTIFICATION_ROUTER: HassKey[NotificationRouter] = HassKey(
+    f"{DOMAIN}_notification_router"
+)
+
+
+class NotificationRouter:
+    """Routes Z-Wave JS notifications to the keypad they came from.
+
+    Every keypad shares a single bus listener, so the work done for each
+    notification does not grow with the number of keypads.
+    """
+
+    __slots__ = ("_handlers", "_hass", "_unsub")
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize NotificationRouter."""
+        self._hass = hass
+        self._handlers: dict[str, Callable[[Event[dict[str, Any]]], None]] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_register(
+        self, device_id: str, handler: Callable[[Event[dict[str, Any]]], None]
+    ) -> CALLBACK_TYPE:
+        """Send notifications from a Z-Wave JS device to a handler."""
+        if self._unsub is None:
+            self._unsub = self._hass.bus.async_listen(
+                ZWAVE_NOTIFICATION, self._async_route
+            )
+        self._handlers[device_id] = handler
+        return functools.partial(self._async_unregister, device_id, handler)
+
+    @callback
+    def _async_unregister(
+        self, device_id: str, handler: Callable[[Event[dict[str, Any]]], None]
+    ) -> None:
+        """Stop sending notifications to a handler."""
+        if self._handlers.get(device_id) == handler:
+            del self._handlers[device_id]
+        if not self._handlers and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_route(self, event: Event[dict[str, Any]]) -> None:
+        """Pass a notification to the handler for its device."""
+        if (handler := self._handlers.get(event.data.get(CONF_DEVICE_ID))) is not None:
+            handler(event)
 
-KEYPAD_EVENT_TYPES = {
-    keypad_event_type: name for name, keypad_event_type, _ in KEYAD_EVENTS
-}
-ENTITY_EVENT_TYPES = {
-    keypad_event_type: entity_event_type
-    for _, keypad_event_type, entity_event_type in KEYAD_EVENTS
-}
-ENTITY_EVENT_TYPE_VALUES = list(set(ENTITY_EVENT_TYPES.values()))
+
+@callback
+def _async_get_router(hass: HomeAssistant) -> NotificationRouter:
+    """Return the notification router, creating it on first use."""
+    if (router := hass.data.get(DATA_NOTIFICATION_ROUTER)) is None:
+        router = hass.data[DATA_NOTIFICATION_ROUTER] = NotificationRouter(hass)
+    return router
 
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry,
+    config_entry: RingKeypadConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Initialize a config entry."""
 
-    device_registry = dr.async_get(hass)
-    device_entry = device_registry.async_get(config_entry.options[CONF_DEVICE_ID])
-    if device_entry is None:
-        raise HomeAssistantError("Unable to load device entry")
-    async_add_entities(
-        [
-            RingKeypadEventEntity(
-                config_entry.entry_id,
-                device_entry,
-                zwave_device_id=config_entry.options[CONF_DEVICE_ID],
-            )
-        ]
+    runtime_data = config_entry.runtime_data
+    options = config_entry.options
+    code_verifier: CodeVerifier | None = None
+    if code_hashes := options.get(CONF_CODE_HASHES):
+        code_verifier = CodeVerifier(options[CONF_CODE_SALT], code_hashes)
+    entity = RingKeypadEventEntity(
+        config_entry.entry_id,
+        runtime_data.device_entry,
+        zwave_device_id=runtime_data.zwave_device_id,
+        suppress_events=options.get(CONF_SUPPRESS_EVENTS),
+        coalesce_pressed=options.get(CONF_COALESCE_PRESSED),
+        keypress_event=options.get(CONF_KEYPRESS_EVENT, False),
+        state_writes=options.get(CONF_STATE_WRITES, STATE_WRITES_ALL),
+        max_code_attempts=int(options.get(CONF_MAX_CODE_ATTEMPTS, 0)),
+        code_lockout=options.get(CONF_CODE_LOCKOUT, DEFAULT_LOCKOUT),
+        code_verifier=code_verifier,
     )
+    runtime_data.entity = entity
+    async_add_entities([entity])
 
 
 class RingKeypadEventEntity(EventEntity):
@@ -56,50 +144,188 @@ class RingKeypadEventEntity(EventEntity):
 
     _attr_has_entity_name = True
     _attr_device_class = EventDeviceClass.BUTTON
-    _attr_event_types = ENTITY_EVENT_TYPE_VALUES
+    _attr_event_types = ENTITY_EVENT_TYPES
     _attr_should_poll = False
     _attr_translation_key = "keypad_event"
+    # The entered code is passed on to automations but never stored
+    _unrecorded_attributes = frozenset({"code"})
 
     def __init__(
         self,
         config_entry_id: str,
         device_entry: dr.DeviceEntry,
         zwave_device_id: str | None = None,
+        suppress_events: list[str] | None = None,
+        coalesce_pressed: float | None = None,
+        keypress_event: bool = False,
+        state_writes: str = STATE_WRITES_ALL,
+        max_code_attempts: int = 0,
+        code_lockout: float = DEFAULT_LOCKOUT,
+        code_verifier: CodeVerifier | None = None,
     ) -> None:
         """Initialize RingKeypadEventEntity."""
         self._attr_unique_id = config_entry_id
         self._device_id = zwave_device_id or device_entry.id
         self.device_entry = device_entry
         self._attr_device_info = None
+        self._suppress_events = frozenset(suppress_events or ())
+        self._coalesce_pressed = coalesce_pressed or 0
+        self._keypress_event = keypress_event
+        self._state_writes = state_writes
+        self._write_debouncer: Debouncer[None] | None = None
+        self._pending_event: tuple[str, dict[str, Any]] | None = None
+        self.decoder = KeypadDecoder()
+        self._last_event: KeypadEvent | None = None
+        self._last_event_time = 0.0
+        self._code_attempts = (
+            CodeAttemptLimiter(max_code_attempts, lockout=code_lockout)
+            if max_code_attempts
+            else None
+        )
+        self.duplicates_suppressed = 0
+        self._code_verifier = code_verifier
+        self.code_attempts_dropped = 0
+        self.invalid_codes = 0
 
     @callback
+    @timed("handle_event")
     def _async_handle_event(self, event: Event[dict[str, Any]]) -> None:
-        """Handle the demo button event."""
-        _LOGGER.debug("Received ZWave notification: data=%s", event.data)
+        """Handle a notification from the keypad's Z-Wave JS device."""
         event_data = event.data
-        if (
-            not (device_id := event_data.get(CONF_DEVICE_ID))
-            or device_id != self._device_id
-        ):
+        _LOGGER.debug("Received ZWave notification for keypad: %s", event)
+        if (keypad_event := self.decoder.decode(event_data)) is None:
             return
-        if (event_type := event_data.get(CONF_EVENT_TYPE)) is None:
+        if self._is_duplicate(keypad_event):
+            self.duplicates_suppressed += 1
+            _LOGGER.debug(
+                "Dropping duplicate Ring Keypad notification (%d suppressed)",
+                self.duplicates_suppressed,
+            )
             return
-        _LOGGER.debug("Received ZWave notification for keypad: %s", event)
-        if not (event_type_name := ENTITY_EVENT_TYPES.get(event_type)):
-            _LOGGER.info(
-                "Ring Keypad received ZWave notification with unknown event type: %s",
+        # Disarm and arm buttons carry the code entered before them too, or an
+        # empty code when they are pressed without one
+        if keypad_event.code and self._drop_code_attempt(keypad_event.code):
+            return
+        if keypad_event.button in self._suppress_events:
+            return
+        event_type_name = keypad_event.entity_event_type
+        event_attributes = {"button": keypad_event.button, "code": keypad_event.code}
+        if (stream := self.hass.data[DATA_STREAM]).has_subscribers:
+            stream.async_publish_keypress(
+                self._device_id,
+                keypad_event.button,
                 event_type_name,
+                keypad_event.code,
+            )
+        if self._keypress_event:
+            async_dispatcher_send(
+                self.hass,
+                SIGNAL_KEYPRESS,
+                {
+                    CONF_DEVICE_ID: self._device_id,
+                    CONF_EVENT_TYPE: event_type_name,
+                    **event_attributes,
+                },
             )
+        if self._state_writes == STATE_WRITES_OFF:
             return
-        keypad_event_type = KEYPAD_EVENT_TYPES[event_type]
-        self._trigger_event(
-            event_type_name,
-            {"button": keypad_event_type, "code": event_data.get(CONF_EVENT_DATA)},
+        if self._write_debouncer is not None:
+            # Only pressed events are coalesced, alarm events and their codes
+            # are always written so automations never miss them
+            if event_type_name == PRESSED_EVENT_TYPE:
+                self._pending_event = (event_type_name, event_attributes)
+                self._write_debouncer.async_schedule_call()
+                return
+            # A newer event replaces any pressed event still waiting to be written
+            self._write_debouncer.async_cancel()
+            self._pending_event = None
+        self._trigger_event(event_type_name, event_attributes)
+        self.async_write_ha_state()
+
+    def _is_duplicate(self, keypad_event: KeypadEvent) -> bool:
+        """Return True if the notification is a retransmit of the previous one."""
+        now = self.hass.loop.time()
+        if (
+            keypad_event == self._last_event
+            and now - self._last_event_time < DEDUP_WINDOW
+        ):
+            return True
+        self._last_event = keypad_event
+        self._last_event_time = now
+        return False
+
+    def _drop_code_attempt(self, code: str | None) -> bool:
+        """Return True if a code attempt is dropped due to too many attempts.
+
+        Dropped attempts never reach the panel or the recorder, and the keypad
+        plays the invalid code message instead. When codes are checked locally
+        the message is also played right away for a code that is not valid,
+        though the code is still sent on to the panel.
+        """
+        limiter = self._code_attempts
+        if limiter is not None:
+            lockouts = limiter.lockouts
+            if not limiter.attempt(self.hass.loop.time()):
+                self.code_attempts_dropped += 1
+                if limiter.lockouts != lockouts:
+                    _LOGGER.warning(
+                        "Too many codes entered on Ring Keypad %s, ignoring codes",
+                        self._device_id,
+                    )
+                self._async_invalid_code()
+                return True
+        if self._code_verifier is not None and code is not None:
+            if self._code_verifier.verify(code):
+                if limiter is not None:
+                    limiter.reset()
+            else:
+                self.invalid_codes += 1
+                self._async_invalid_code()
+        return False
+
+    @callback
+    def _async_invalid_code(self) -> None:
+        """Play the invalid code message on the keypad in the background."""
+        self.hass.async_create_background_task(
+            self._async_send_invalid_code(), "ring_keypad invalid code"
+        )
+
+    async def _async_send_invalid_code(self) -> None:
+        """Tell the person at the keypad their code was not accepted."""
+        request = CommandRequest(
+            (self._device_id,), chime_command("invalid_code", None)
         )
+        try:
+            await self.hass.data[DATA_DISPATCHER].async_send(request)
+        except HomeAssistantError as err:
+            _LOGGER.debug("Failed to send invalid code to keypad: %s", err)
+
+    @callback
+    def _async_write_pending(self) -> None:
+        """Write the most recent event from a burst."""
+        if self._pending_event is None:
+            return
+        event_type, event_attributes = self._pending_event
+        self._pending_event = None
+        self._trigger_event(event_type, event_attributes)
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks with your device API/library."""
+        cooldown = self._coalesce_pressed
+        if self._state_writes == STATE_WRITES_RATE_LIMITED:
+            cooldown = max(cooldown, STATE_WRITE_INTERVAL)
+        if cooldown:
+            self._write_debouncer = Debouncer(
+                self.hass,
+                _LOGGER,
+                cooldown=cooldown,
+                immediate=True,
+                function=self._async_write_pending,
+            )
+            self.async_on_remove(self._write_debouncer.async_shutdown)
         self.async_on_remove(
-            self.hass.bus.async_listen(ZWAVE_NOTIFICATION, self._async_handle_event)
+            _async_get_router(self.hass).async_register(
+                self._device_id, self._async_handle_event
+            )
         )
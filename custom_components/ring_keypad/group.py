@@ -0,0 +1,54 @@
+"""Named groups of Ring Keypads that can be targeted by services."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Mapping
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_GROUPS: HassKey[KeypadGroups] = HassKey(f"{DOMAIN}_groups")
+
+
+class KeypadGroups:
+    """Resolves keypad groups to Z-Wave JS device ids.
+
+    Resolved groups are cached until the device registry changes or a keypad
+    is loaded or unloaded.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        groups: Mapping[str, list[str]],
+        resolver: Callable[[HomeAssistant, list[str]], list[str]],
+    ) -> None:
+        """Initialize KeypadGroups."""
+        self._hass = hass
+        self._groups = groups
+        self._resolver = resolver
+        self._cache: dict[str, tuple[str, ...]] = {}
+
+    @callback
+    def async_resolve(self, name: str) -> tuple[str, ...]:
+        """Return the Z-Wave JS device ids for the keypads in a group."""
+        if (device_ids := self._cache.get(name)) is not None:
+            return device_ids
+        if (members := self._groups.get(name)) is None:
+            raise ServiceValidationError(f"Unknown Ring Keypad group: {name}")
+        device_ids = tuple(dict.fromkeys(self._resolver(self._hass, members)))
+        self._cache[name] = device_ids
+        return device_ids
+
+    @callback
+    def async_invalidate(self, event: Event | None = None) -> None:
+        """Clear resolved groups when the devices they resolve to may change."""
+        if self._cache:
+            _LOGGER.debug("Clearing resolved Ring Keypad groups")
+            self._cache.clear()
@@ -0,0 +1,53 @@
+"""Brute force protection for codes entered on Ring Keypads."""
+
+from __future__ import annotations
+
+from collections import deque
+
+# Seconds in which the maximum number of code attempts may be made
+ATTEMPT_WINDOW = 60.0
+DEFAULT_LOCKOUT = 300.0
+
+
+class CodeAttemptLimiter:
+    """Limits code attempts on a keypad using a fixed size ring of timestamps.
+
+    The panel's decision is not visible to the keypad, so every code entered
+    counts as an attempt until the limiter is reset.
+    """
+
+    __slots__ = ("_attempts", "_lockout", "_window", "locked_until", "lockouts")
+
+    def __init__(
+        self,
+        max_attempts: int,
+        window: float = ATTEMPT_WINDOW,
+        lockout: float = DEFAULT_LOCKOUT,
+    ) -> None:
+        """Initialize CodeAttemptLimiter."""
+        self._attempts: deque[float] = deque(maxlen=max_attempts)
+        self._window = window
+        self._lockout = lockout
+        self.locked_until = 0.0
+        self.lockouts = 0
+
+    def attempt(self, now: float) -> bool:
+        """Record a code attempt and return False if it must be dropped.
+
+        An attempt when the ring is full of attempts made within the window
+        starts a lockout, and every attempt during the lockout is dropped.
+        """
+        if now < self.locked_until:
+            return False
+        attempts = self._attempts
+        if len(attempts) == attempts.maxlen and now - attempts[0] < self._window:
+            attempts.clear()
+            self.locked_until = now + self._lockout
+            self.lockouts += 1
+            return False
+        attempts.append(now)
+        return True
+
+    def reset(self) -> None:
+        """Forget previous attempts after a code is accepted."""
+        self._attempts.clear()
@@ -0,0 +1,227 @@
+"""OpenMetrics view of the Ring Keypad performance counters."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .controller import LATENCY_BUCKETS
+from .data import RingKeypadConfigEntry
+from .dispatch import DATA_DISPATCHER
+from .refresh import DATA_REFRESHER
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = DOMAIN
+
+# Label value for devices that are not on a known Z-Wave JS controller
+UNKNOWN_CONTROLLER = "unknown"
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register the metrics view."""
+    hass.http.register_view(RingKeypadMetricsView)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _family(
+    lines: list[str],
+    name: str,
+    metric_type: str,
+    help_text: str,
+    samples: Iterable[tuple[str, str, float]],
+) -> None:
+    """Add a metric family with samples of (suffix, labels, value)."""
+    lines.append(f"# TYPE {PREFIX}_{name} {metric_type}")
+    lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+    lines.extend(
+        f"{PREFIX}_{name}{suffix}{{{labels}}} {value}"
+        if labels
+        else f"{PREFIX}_{name}{suffix} {value}"
+        for suffix, labels, value in samples
+    )
+
+
+@callback
+def async_render_metrics(hass: HomeAssistant) -> str:
+    """Render the counters kept by the integration in OpenMetrics text format.
+
+    Every value is read from counters that are updated as events and commands
+    are handled, so rendering does no aggregation beyond the histograms.
+    """
+    lines: list[str] = []
+    entries: list[RingKeypadConfigEntry] = hass.config_entries.async_loaded_entries(
+        DOMAIN
+    )
+    keypads = [
+        (f'device_id="{_escape(entry.runtime_data.zwave_device_id)}"', entity)
+        for entry in entries
+        if (entity := entry.runtime_data.entity) is not None
+    ]
+    _family(
+        lines,
+        "events_decoded",
+        "counter",
+        "Keypad notifications decoded into keypad events.",
+        (
+            ("_total", labels, entity.decoder.events_decoded)
+            for labels, entity in keypads
+        ),
+    )
+    _family(
+        lines,
+        "events_rejected",
+        "counter",
+        "Keypad notifications that were not passed on, by reason.",
+        (
+            ("_total", f'{labels},reason="{reason}"', value)
+            for labels, entity in keypads
+            for reason, value in (
+                ("unknown", entity.decoder.events_unknown),
+                ("duplicate", entity.duplicates_suppressed),
+                ("code_lockout", entity.code_attempts_dropped),
+            )
+        ),
+    )
+    _family(
+        lines,
+        "invalid_codes",
+        "counter",
+        "Codes entered that are not one of the valid codes.",
+        (("_total", labels, entity.invalid_codes) for labels, entity in keypads),
+    )
+
+    if (dispatcher := hass.data.get(DATA_DISPATCHER)) is not None:
+        controllers = [
+            (
+                f'controller="{_escape(queue.controller_id or UNKNOWN_CONTROLLER)}"',
+                queue,
+            )
+            for queue in dispatcher.controllers.values()
+        ]
+        _family(
+            lines,
+            "keypad_commands",
+            "counter",
+            "Commands sent to each keypad.",
+            (
+                ("_total", f'device_id="{_escape(device_id)}"', wait.commands)
+                for _, queue in controllers
+                for device_id, wait in queue.keypads.items()
+            ),
+        )
+        _family(
+            lines,
+            "keypad_wait_seconds",
+            "counter",
+            "Time commands to each keypad waited for the controller.",
+            (
+                ("_total", f'device_id="{_escape(device_id)}"', wait.wait_time)
+                for _, queue in controllers
+                for device_id, wait in queue.keypads.items()
+            ),
+        )
+        _family(
+            lines,
+            "commands_sent",
+            "counter",
+            "Commands sent through each Z-Wave JS controller.",
+            (("_total", labels, queue.commands_sent) for labels, queue in controllers),
+        )
+        _family(
+            lines,
+            "command_failures",
+            "counter",
+            "Commands that failed on each Z-Wave JS controller.",
+            (("_total", labels, queue.failures) for labels, queue in controllers),
+        )
+        _family(
+            lines,
+            "queue_depth",
+            "gauge",
+            "Commands waiting for each Z-Wave JS controller.",
+            (("", labels, queue.queued) for labels, queue in controllers),
+        )
+        _family(
+            lines,
+            "queue_wait_seconds",
+            "counter",
+            "Time commands waited for each Z-Wave JS controller.",
+            (("_total", labels, queue.wait_time) for labels, queue in controllers),
+        )
+        _family(
+            lines,
+            "command_latency_seconds",
+            "histogram",
+            "Time taken by Z-Wave JS to send each command.",
+            (
+                sample
+                for labels, queue in controllers
+                for sample in _histogram_samples(labels, queue.latency.counts)
+                + [
+                    ("_count", labels, queue.latency.count),
+                    ("_sum", labels, queue.latency.sum),
+                ]
+            ),
+        )
+        _family(
+            lines,
+            "dedup_hits",
+            "counter",
+            "Identical commands answered by a command already sent.",
+            [("_total", "", dispatcher.idempotent_hits)],
+        )
+        _family(
+            lines,
+            "commands_parked",
+            "counter",
+            "Commands held until an asleep or dead keypad was alive again.",
+            [("_total", "", dispatcher.commands_parked)],
+        )
+
+    if (refresher := hass.data.get(DATA_REFRESHER)) is not None:
+        _family(
+            lines,
+            "refreshes",
+            "counter",
+            "Alarm states sent to keypads again by the periodic refresh.",
+            [
+                ("_total", 'result="sent"', refresher.refreshes_sent),
+                ("_total", 'result="skipped"', refresher.refreshes_skipped),
+            ],
+        )
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_samples(labels: str, counts: list[int]) -> list[tuple[str, str, float]]:
+    """Return the cumulative bucket samples of a histogram."""
+    samples: list[tuple[str, str, float]] = []
+    total = 0
+    for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), counts, strict=True):
+        total += count
+        samples.append(("_bucket", f'{labels},le="{bound}"', total))
+    return samples
+
+
+class RingKeypadMetricsView(HomeAssistantView):
+    """Serves the Ring Keypad counters to authenticated scrapers."""
+
+    url = f"/api/{DOMAIN}/metrics"
+    name = f"api:{DOMAIN}:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the counters in OpenMetrics text format."""
+        hass = request.app[KEY_HASS]
+        return web.Response(
+            body=async_render_metrics(hass).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
@@ -6,8 +6,6 @@ https://github.com/ImSorryButWho/HomeAssistantNotes/blob/main/RingKeypadV2.md
 
 import enum
 
-from homeassistant.components.alarm_control_panel import AlarmControlPanelState
-
 from .const import DEFAULT_DELAY
 
 EVENT_COMMAND_CLASS = "111"
@@ -72,16 +70,34 @@ class NotificationSound(enum.IntEnum):
     DOORBELL = 100
 
 
+# Home Assistant Alarm Control Panel entity states. These match the values of
+# AlarmControlPanelState and are plain strings to avoid importing the
+# alarm_control_panel component when loading the integration.
+STATE_ARMED_AWAY = "armed_away"
+STATE_ARMED_HOME = "armed_home"
+STATE_ARMING = "arming"
+STATE_DISARMED = "disarmed"
+STATE_PENDING = "pending"
+STATE_TRIGGERED = "triggered"
+
+# States where the keypad announces and counts down a delay
+COUNTDOWN_STATES = frozenset({STATE_ARMING, STATE_PENDING})
+
 # Mapping of Home Assistant entity state to keypad messages
 ALARM_STATE = {
-    AlarmControlPanelState.ARMED_AWAY: Message.ARMED_AWAY,
-    AlarmControlPanelState.ARMED_HOME: Message.ARMED_HOME,
-    AlarmControlPanelState.ARMING: Delay.EXIT_DELAY,
-    AlarmControlPanelState.DISARMED: Message.DISARMED,
-    AlarmControlPanelState.PENDING: Delay.ENTRY_DELAY,
-    AlarmControlPanelState.TRIGGERED: AlarmSound.BURGLAR_ALARM,
+    STATE_ARMED_AWAY: Message.ARMED_AWAY,
+    STATE_ARMED_HOME: Message.ARMED_HOME,
+    STATE_ARMING: Delay.EXIT_DELAY,
+    STATE_DISARMED: Message.DISARMED,
+    STATE_PENDING: Delay.ENTRY_DELAY,
+    STATE_TRIGGERED: AlarmSound.BURGLAR_ALARM,
 }
 
+# States that sound an alarm, which would sound again if they were resent
+ALARM_SOUND_STATES = frozenset(
+    state for state, message in ALARM_STATE.items() if isinstance(message, AlarmSound)
+)
+
 CHIME = {
     "invalid_code": Message.INVALID_CODE,
     "need_bypass": Message.NEED_BYPASS,
@@ -109,9 +125,7 @@ def _format_delay(delay: int | None) -> str:
     return f"{minutes}m{seconds}s"
 
 
-def alarm_state_command(
-    state: AlarmControlPanelState, delay: int | None
-) -> dict[str, str | int]:
+def alarm_state_command(state: str, delay: int | None) -> dict[str, str | int]:
     """Return a zwave command for updating the alarm state."""
     if not (message := ALARM_STATE.get(state)):
         raise ValueError(f"Invalid alarm state command: {state}")
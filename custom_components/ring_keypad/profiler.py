@@ -0,0 +1,136 @@
+"""On demand profiling of the Ring Keypad hot paths."""
+
+from __future__ import annotations
+
+import cProfile
+import dataclasses
+import functools
+import inspect
+import io
+import pstats
+import time
+from collections import defaultdict
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+# Number of functions included in the cProfile section of the report
+CPROFILE_LINES = 40
+
+# Wall clock timings in seconds by name, or None when not profiling. Checking
+# this is the only work the timed functions do when profiling is disabled.
+_timings: defaultdict[str, list[float]] | None = None
+
+
+def timed[**P, R](name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Record the wall clock time of a function while profiling."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        if inspect.iscoroutinefunction(func):
+            async_func: Callable[P, Coroutine[Any, Any, Any]] = func
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                if (timings := _timings) is None:
+                    return await async_func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await async_func(*args, **kwargs)
+                finally:
+                    timings[name].append(time.perf_counter() - start)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if (timings := _timings) is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[name].append(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TimingStats:
+    """Summary of the timings recorded for one function."""
+
+    count: int
+    total: float
+    mean: float
+    p95: float
+    max: float
+
+    @classmethod
+    def from_timings(cls, timings: list[float]) -> TimingStats:
+        """Summarize the timings in seconds."""
+        ordered = sorted(timings)
+        return cls(
+            count=len(ordered),
+            total=sum(ordered),
+            mean=sum(ordered) / len(ordered),
+            p95=ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            max=ordered[-1],
+        )
+
+
+class ProfileSession:
+    """Records timings, and optionally a cProfile, until stopped."""
+
+    def __init__(self, use_cprofile: bool = False) -> None:
+        """Initialize ProfileSession."""
+        self._profile = cProfile.Profile() if use_cprofile else None
+        self._timings: defaultdict[str, list[float]] = defaultdict(list)
+
+    @staticmethod
+    def is_running() -> bool:
+        """Return True if a profile session is running."""
+        return _timings is not None
+
+    def start(self) -> None:
+        """Start recording."""
+        global _timings
+        _timings = self._timings
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self) -> dict[str, TimingStats]:
+        """Stop recording and return the timing summary."""
+        global _timings
+        if self._profile is not None:
+            self._profile.disable()
+        _timings = None
+        return {
+            name: TimingStats.from_timings(timings)
+            for name, timings in sorted(self._timings.items())
+        }
+
+    def report(self, stats: dict[str, TimingStats], seconds: float) -> str:
+        """Return a text report of the session."""
+        lines = [
+            f"Ring Keypad profile over {seconds:g} seconds",
+            "",
+            (
+                f"{'function':<24}{'count':>8}{'total ms':>12}{'mean ms':>12}"
+                f"{'p95 ms':>12}{'max ms':>12}"
+            ),
+        ]
+        lines.extend(
+            f"{name:<24}{stat.count:>8}{stat.total * 1000:>12.3f}"
+            f"{stat.mean * 1000:>12.3f}{stat.p95 * 1000:>12.3f}"
+            f"{stat.max * 1000:>12.3f}"
+            for name, stat in stats.items()
+        )
+        if not stats:
+            lines.append("No keypad activity was recorded")
+        if self._profile is not None:
+            output = io.StringIO()
+            pstats.Stats(self._profile, stream=output).sort_stats(
+                pstats.SortKey.CUMULATIVE
+            ).print_stats(CPROFILE_LINES)
+            lines.extend(["", output.getvalue()])
+        return "\n".join(lines) + "\n"
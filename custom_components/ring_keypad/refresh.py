@@ -0,0 +1,93 @@
+"""Periodic refresh of the alarm state shown on Ring Keypads."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .dispatch import CommandDispatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_REFRESHER: HassKey[StateRefresher] = HassKey(f"{DOMAIN}_refresher")
+
+# Fraction of each keypad's slot in the interval used to jitter its refresh
+JITTER = 0.5
+# Fraction of the interval within which a confirmed keypad is not refreshed
+CONFIRMED_RECENTLY = 0.25
+# Seconds to wait before checking again while other commands are being sent
+BUSY_DELAY = 1.0
+
+
+class StateRefresher:
+    """Sends the expected alarm state to keypads again at an interval.
+
+    Keypads are write-only, so a dropped frame leaves a keypad showing the
+    wrong state until the next alarm transition. Each keypad gets an even slot
+    of the interval with its refresh jittered within the slot, so refreshes
+    never arrive at the controller in a burst. Keypads that recently confirmed
+    their state are skipped, and refreshes wait while other commands are
+    being sent since those always take priority.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, dispatcher: CommandDispatcher, interval: float
+    ) -> None:
+        """Initialize StateRefresher."""
+        self._hass = hass
+        self._dispatcher = dispatcher
+        self._interval = interval
+        self.refreshes_sent = 0
+        self.refreshes_skipped = 0
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start refreshing keypads in the background and return a stop callback."""
+        task = self._hass.async_create_background_task(
+            self._async_run(), f"{DOMAIN} state refresh"
+        )
+        return task.cancel
+
+    async def _async_run(self) -> None:
+        """Refresh each keypad once per interval."""
+        loop = self._hass.loop
+        while True:
+            start = loop.time()
+            device_ids = list(self._dispatcher.shadow)
+            slot = self._interval / max(len(device_ids), 1)
+            for index, device_id in enumerate(device_ids):
+                offset = index + 0.5 + random.uniform(-JITTER, JITTER) / 2
+                if (remaining := start + offset * slot - loop.time()) > 0:
+                    await asyncio.sleep(remaining)
+                while self._dispatcher.busy:
+                    # Shift the rest of the round so keypads keep their spacing
+                    paused = loop.time()
+                    await asyncio.sleep(BUSY_DELAY)
+                    start += loop.time() - paused
+                await self._async_refresh(device_id)
+            if (remaining := start + self._interval - loop.time()) > 0:
+                await asyncio.sleep(remaining)
+
+    async def _async_refresh(self, device_id: str) -> None:
+        """Refresh a single keypad unless it is not ready or recently confirmed."""
+        if (shadow := self._dispatcher.shadow.get(device_id)) is None:
+            return
+        if not self._dispatcher.is_ready(device_id) or (
+            shadow.confirmed is not None
+            and self._hass.loop.time() - shadow.confirmed
+            < self._interval * CONFIRMED_RECENTLY
+        ):
+            self.refreshes_skipped += 1
+            return
+        _LOGGER.debug("Refreshing alarm state of keypad %s", device_id)
+        self.refreshes_sent += 1
+        try:
+            await self._dispatcher.async_refresh(device_id)
+        except HomeAssistantError as err:
+            _LOGGER.debug("Failed to refresh keypad %s: %s", device_id, err)
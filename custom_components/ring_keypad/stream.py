@@ -0,0 +1,172 @@
+"""Live stream of keypad activity for WebSocket subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STREAM: HassKey[KeypadEventStream] = HassKey(f"{DOMAIN}_stream")
+
+# Seconds activity is collected before it is sent to subscribers
+BATCH_WINDOW = 0.1
+# Messages kept while waiting to be sent, older messages are dropped
+MAX_BATCH = 1000
+
+# Compact message keys
+KIND = "k"
+DEVICE = "d"
+TIME = "t"
+BUTTON = "b"
+EVENT_TYPE = "e"
+CODE = "c"
+PROPERTY = "p"
+VALUE = "v"
+SUCCESS = "ok"
+LATENCY = "ms"
+ERROR = "err"
+
+KIND_KEYPRESS = "keypress"
+KIND_COMMAND = "command"
+
+
+class _Subscriber:
+    """A WebSocket subscription to keypad activity."""
+
+    __slots__ = ("device_ids", "include_code", "send")
+
+    def __init__(
+        self,
+        device_ids: frozenset[str] | None,
+        include_code: bool,
+        send: Callable[[list[dict[str, Any]]], None],
+    ) -> None:
+        """Initialize _Subscriber."""
+        self.device_ids = device_ids
+        self.include_code = include_code
+        self.send = send
+
+
+class KeypadEventStream:
+    """Sends decoded keypresses and command outcomes to subscribers.
+
+    Keypads and the dispatcher publish into the stream once no matter how many
+    subscribers there are. Messages are collected for a short window and each
+    subscriber gets one batch with the keypads it selected. Entered codes are
+    only sent to subscribers that asked for them.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: float = BATCH_WINDOW) -> None:
+        """Initialize KeypadEventStream."""
+        self._hass = hass
+        self._window = window
+        self._subscribers: list[_Subscriber] = []
+        self._batch: list[tuple[str, dict[str, Any], str | None]] = []
+        self._flush: asyncio.TimerHandle | None = None
+        self.messages_dropped = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Return True if anything is subscribed to the stream."""
+        return bool(self._subscribers)
+
+    @callback
+    def async_subscribe(
+        self,
+        send: Callable[[list[dict[str, Any]]], None],
+        device_ids: frozenset[str] | None = None,
+        include_code: bool = False,
+    ) -> CALLBACK_TYPE:
+        """Send batches of activity for the keypads, or all keypads if None."""
+        subscriber = _Subscriber(device_ids, include_code, send)
+        self._subscribers.append(subscriber)
+        return functools.partial(self._async_unsubscribe, subscriber)
+
+    @callback
+    def _async_unsubscribe(self, subscriber: _Subscriber) -> None:
+        """Remove a subscriber."""
+        self._subscribers.remove(subscriber)
+        if not self._subscribers:
+            self._batch.clear()
+            if self._flush is not None:
+                self._flush.cancel()
+                self._flush = None
+
+    @callback
+    def async_publish_keypress(
+        self, device_id: str, button: str, event_type: str, code: str | None
+    ) -> None:
+        """Publish a decoded keypress."""
+        self._async_publish(
+            device_id,
+            {KIND: KIND_KEYPRESS, BUTTON: button, EVENT_TYPE: event_type},
+            code,
+        )
+
+    @callback
+    def async_publish_command(
+        self,
+        device_ids: list[str],
+        command: dict[str, Any],
+        latency: float,
+        error: Exception | None = None,
+    ) -> None:
+        """Publish the outcome of a command sent to keypads."""
+        message = {
+            KIND: KIND_COMMAND,
+            PROPERTY: command.get("property"),
+            VALUE: command.get("value"),
+            SUCCESS: error is None,
+            LATENCY: round(latency * 1000, 1),
+        }
+        if error is not None:
+            message[ERROR] = str(error)
+        for device_id in device_ids:
+            self._async_publish(device_id, message, None)
+
+    @callback
+    def _async_publish(
+        self, device_id: str, message: dict[str, Any], code: str | None
+    ) -> None:
+        """Add a message to the batch sent at the end of the window."""
+        if not self._subscribers:
+            return
+        if len(self._batch) >= MAX_BATCH:
+            self.messages_dropped += 1
+            return
+        message = {
+            **message,
+            DEVICE: device_id,
+            TIME: round(dt_util.utcnow().timestamp(), 3),
+        }
+        self._batch.append((device_id, message, code))
+        if self._flush is None:
+            self._flush = self._hass.loop.call_later(self._window, self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Send the collected messages to each subscriber."""
+        self._flush = None
+        batch = self._batch
+        self._batch = []
+        for subscriber in self._subscribers:
+            device_ids = subscriber.device_ids
+            messages = [
+                {**message, CODE: code}
+                if code is not None and subscriber.include_code
+                else message
+                for device_id, message, code in batch
+                if device_ids is None or device_id in device_ids
+            ]
+            if messages:
+                subscriber.send(messages)
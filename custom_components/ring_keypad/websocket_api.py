@@ -0,0 +1,61 @@
+"""WebSocket API for Ring Keypad."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import Unauthorized
+from homeassistant.helpers import config_validation as cv
+
+from .data import resolve_zwave_device_ids
+from .stream import DATA_STREAM
+
+CONF_INCLUDE_CODE = "include_code"
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register the Ring Keypad WebSocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ring_keypad/subscribe",
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(CONF_INCLUDE_CODE, default=False): cv.boolean,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream keypresses and command outcomes for the selected keypads."""
+    if msg[CONF_INCLUDE_CODE] and not connection.user.is_admin:
+        raise Unauthorized
+    msg_id = msg["id"]
+
+    @callback
+    def async_send(messages: list[dict[str, Any]]) -> None:
+        """Send a batch of keypad activity to the client."""
+        connection.send_message(
+            websocket_api.event_message(msg_id, {"events": messages})
+        )
+
+    device_ids = msg.get(ATTR_DEVICE_ID)
+    connection.subscriptions[msg_id] = hass.data[DATA_STREAM].async_subscribe(
+        async_send,
+        device_ids=(
+            frozenset(resolve_zwave_device_ids(hass, device_ids))
+            if device_ids is not None
+            else None
+        ),
+        include_code=msg[CONF_INCLUDE_CODE],
+    )
+    connection.send_result(msg_id)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Summarize Ring Keypad usage from a Home Assistant recorder database.
+
+This reads the `event.*` entity history for Ring Keypads out of the recorder
+SQLite database and writes a compact JSON report with keypress counts per hour
+of the day, code entry timeouts and cancelled arming delays.
+
+Rows are streamed from the database in batches so memory use stays bounded
+regardless of how much history is stored. Keypads may be processed in
+separate worker processes with `--jobs` for large databases.
+
+Usage:
+    script/keypad_stats.py config/home-assistant_v2.db
+    script/keypad_stats.py --entity event.front_door_button --jobs 4 <db>
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime
+import json
+import pathlib
+import sqlite3
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+BATCH_SIZE = 1000
+DEFAULT_EXIT_DELAY = 60
+
+# Button attribute values published by the Ring Keypad event entity
+KEYPAD_BUTTONS = frozenset(
+    {
+        "code_started",
+        "code_timeout",
+        "code_cancel",
+        "code_entered",
+        "disarm",
+        "arm_away",
+        "arm_stay",
+        "fire",
+        "police",
+        "medical",
+    }
+)
+ARM_EVENT_TYPES = frozenset({"alarm_arm_away", "alarm_arm_home"})
+DISARM_EVENT_TYPE = "alarm_disarm"
+IGNORED_STATES = frozenset({"unknown", "unavailable"})
+
+FIND_ENTITIES_QUERY = """
+SELECT states_meta.entity_id FROM states_meta
+WHERE states_meta.entity_id LIKE 'event.%' AND EXISTS (
+    SELECT 1 FROM states
+    JOIN state_attributes ON states.attributes_id = state_attributes.attributes_id
+    WHERE states.metadata_id = states_meta.metadata_id
+    AND state_attributes.shared_attrs LIKE '%"button":%'
+)
+ORDER BY states_meta.entity_id
+"""
+
+HISTORY_QUERY = """
+SELECT states.state, states.last_updated_ts, state_attributes.shared_attrs
+FROM states
+JOIN states_meta ON states.metadata_id = states_meta.metadata_id
+LEFT JOIN state_attributes ON states.attributes_id = state_attributes.attributes_id
+WHERE states_meta.entity_id = ?
+ORDER BY states.last_updated_ts
+"""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class KeypadRecord:
+    """A single keypress decoded from the recorder history."""
+
+    timestamp: float
+    event_type: str
+    button: str
+
+
+@dataclasses.dataclass(slots=True)
+class KeypadStats:
+    """Aggregated statistics for a single keypad entity."""
+
+    entity_id: str
+    keypresses: int = 0
+    keypresses_per_hour: list[int] = dataclasses.field(default_factory=lambda: [0] * 24)
+    buttons: dict[str, int] = dataclasses.field(default_factory=dict)
+    code_timeouts: int = 0
+    arming_cancelled: int = 0
+    first_seen: float | None = None
+    last_seen: float | None = None
+
+
+def _connect(database: pathlib.Path) -> sqlite3.Connection:
+    """Open the recorder database read only."""
+    return sqlite3.connect(f"{database.resolve().as_uri()}?mode=ro", uri=True)
+
+
+def find_keypad_entities(conn: sqlite3.Connection) -> list[str]:
+    """Return all event entities with Ring Keypad button attributes."""
+    return [entity_id for (entity_id,) in conn.execute(FIND_ENTITIES_QUERY)]
+
+
+def iter_history(
+    conn: sqlite3.Connection, entity_id: str, batch_size: int = BATCH_SIZE
+) -> Iterator[tuple[str, float, str | None]]:
+    """Stream the state history rows for an entity in batches."""
+    cursor = conn.execute(HISTORY_QUERY, (entity_id,))
+    while rows := cursor.fetchmany(batch_size):
+        yield from rows
+
+
+def iter_keypresses(
+    rows: Iterable[tuple[str, float, str | None]],
+) -> Iterator[KeypadRecord]:
+    """Decode recorder state rows into keypad records."""
+    for state, timestamp, shared_attrs in rows:
+        if state in IGNORED_STATES or not shared_attrs:
+            continue
+        attributes: dict[str, Any] = json.loads(shared_attrs)
+        if (button := attributes.get("button")) not in KEYPAD_BUTTONS:
+            continue
+        yield KeypadRecord(
+            timestamp=timestamp,
+            event_type=attributes.get("event_type") or "",
+            button=button,
+        )
+
+
+def aggregate(
+    entity_id: str,
+    records: Iterable[KeypadRecord],
+    exit_delay: int = DEFAULT_EXIT_DELAY,
+    tz: datetime.tzinfo | None = None,
+) -> KeypadStats:
+    """Aggregate a time ordered stream of keypad records."""
+    stats = KeypadStats(entity_id)
+    last_armed: float | None = None
+    for record in records:
+        stats.keypresses += 1
+        hour = datetime.datetime.fromtimestamp(record.timestamp, tz).hour
+        stats.keypresses_per_hour[hour] += 1
+        stats.buttons[record.button] = stats.buttons.get(record.button, 0) + 1
+        if stats.first_seen is None:
+            stats.first_seen = record.timestamp
+        stats.last_seen = record.timestamp
+        if record.button == "code_timeout":
+            stats.code_timeouts += 1
+        if record.event_type in ARM_EVENT_TYPES:
+            last_armed = record.timestamp
+        elif record.event_type == DISARM_EVENT_TYPE:
+            if last_armed is not None and record.timestamp - last_armed <= exit_delay:
+                stats.arming_cancelled += 1
+            last_armed = None
+    return stats
+
+
+def analyze_entity(
+    database: pathlib.Path,
+    entity_id: str,
+    exit_delay: int = DEFAULT_EXIT_DELAY,
+    tz: datetime.tzinfo | None = None,
+) -> KeypadStats:
+    """Compute the statistics for a single keypad entity."""
+    conn = _connect(database)
+    try:
+        return aggregate(
+            entity_id,
+            iter_keypresses(iter_history(conn, entity_id)),
+            exit_delay=exit_delay,
+            tz=tz,
+        )
+    finally:
+        conn.close()
+
+
+def analyze(
+    database: pathlib.Path,
+    entity_ids: list[str] | None = None,
+    exit_delay: int = DEFAULT_EXIT_DELAY,
+    jobs: int = 1,
+    tz: datetime.tzinfo | None = None,
+) -> list[KeypadStats]:
+    """Compute statistics for all keypad entities in the database."""
+    if not entity_ids:
+        conn = _connect(database)
+        try:
+            entity_ids = find_keypad_entities(conn)
+        finally:
+            conn.close()
+    if jobs <= 1 or len(entity_ids) <= 1:
+        return [
+            analyze_entity(database, entity_id, exit_delay, tz)
+            for entity_id in entity_ids
+        ]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                analyze_entity,
+                [database] * len(entity_ids),
+                entity_ids,
+                [exit_delay] * len(entity_ids),
+                [tz] * len(entity_ids),
+            )
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Write a keypad usage report for a recorder database."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database", type=pathlib.Path, help="Recorder SQLite file")
+    parser.add_argument(
+        "--entity",
+        action="append",
+        dest="entity_ids",
+        help="Keypad event entity id (default: all keypads found)",
+    )
+    parser.add_argument(
+        "--exit-delay",
+        type=int,
+        default=DEFAULT_EXIT_DELAY,
+        help="Seconds after arming where a disarm counts as a cancelled delay",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes")
+    parser.add_argument("--output", type=pathlib.Path, help="Report file")
+    args = parser.parse_args(argv)
+
+    if not args.database.exists():
+        parser.error(f"Database not found: {args.database}")
+
+    results = analyze(
+        args.database,
+        args.entity_ids,
+        exit_delay=args.exit_delay,
+        jobs=args.jobs,
+    )
+    report = json.dumps(
+        [dataclasses.asdict(stats) for stats in results],
+        separators=(",", ":"),
+    )
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 
 import logging
 from collections.abc import AsyncGenerator, Generator
+from typing import Any
 from unittest.mock import patch
 
 import pytest
@@ -75,9 +76,15 @@ async def mock_zwave_device_id(
     return device_entry.id
 
 
+@pytest.fixture(name="config_entry_options")
+def mock_config_entry_options() -> dict[str, Any]:
+    """Fixture for additional config entry options."""
+    return {}
+
+
 @pytest.fixture(name="config_entry")
 async def mock_config_entry(
-    hass: HomeAssistant, zwave_device_id: str
+    hass: HomeAssistant, zwave_device_id: str, config_entry_options: dict[str, Any]
 ) -> MockConfigEntry:
     """Fixture to create a configuration entry."""
     config_entry = MockConfigEntry(
@@ -85,6 +92,7 @@ async def mock_config_entry(
         domain=DOMAIN,
         options={
             CONF_DEVICE_ID: zwave_device_id,
+            **config_entry_options,
         },
         title="Device name",
     )
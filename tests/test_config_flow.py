@@ -8,8 +8,19 @@ from homeassistant.const import (
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.const import (
+    CONF_COALESCE_PRESSED,
+    CONF_CODE_LOCKOUT,
+    CONF_KEYPRESS_EVENT,
+    CONF_MAX_CODE_ATTEMPTS,
+    CONF_STATE_WRITES,
+    CONF_SUPPRESS_EVENTS,
+    CONF_VERIFY_CODES,
+    DOMAIN,
+)
+from custom_components.ring_keypad.verifier import CodeVerifier
 
 
 async def test_select_device(
@@ -41,3 +52,92 @@ async def test_select_device(
         CONF_DEVICE_ID: zwave_device_id,
     }
     assert len(mock_setup.mock_calls) == 1
+
+
+async def test_options_flow(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test updating the event options reloads the config entry."""
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result.get("type") is FlowResultType.FORM
+    assert result.get("step_id") == "init"
+
+    with patch(
+        "custom_components.ring_keypad.async_setup_entry", return_value=True
+    ) as mock_setup:
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {
+                CONF_SUPPRESS_EVENTS: ["code_started"],
+                CONF_COALESCE_PRESSED: 1,
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result.get("type") is FlowResultType.CREATE_ENTRY
+    assert config_entry.options == {
+        CONF_DEVICE_ID: zwave_device_id,
+        CONF_SUPPRESS_EVENTS: ["code_started"],
+        CONF_COALESCE_PRESSED: 1,
+        CONF_MAX_CODE_ATTEMPTS: 0,
+        CONF_CODE_LOCKOUT: 300,
+        CONF_VERIFY_CODES: False,
+        CONF_KEYPRESS_EVENT: False,
+        CONF_STATE_WRITES: "all",
+    }
+    assert len(mock_setup.mock_calls) == 1
+
+
+async def test_options_flow_valid_codes(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test only salted hashes of the valid codes are stored."""
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+
+    # A code is required to check codes locally
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_VERIFY_CODES: True}
+    )
+    assert result.get("type") is FlowResultType.FORM
+    assert result.get("errors") == {"base": "valid_codes_required"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_VERIFY_CODES: True, "valid_codes": ["12a4"]}
+    )
+    assert result.get("type") is FlowResultType.FORM
+    assert result.get("errors") == {"base": "invalid_code"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_VERIFY_CODES: True, "valid_codes": ["1234"]}
+    )
+    await hass.async_block_till_done()
+    assert result.get("type") is FlowResultType.CREATE_ENTRY
+    assert "valid_codes" not in config_entry.options
+    assert "1234" not in str(config_entry.options)
+    verifier = CodeVerifier(
+        config_entry.options["code_salt"], config_entry.options["code_hashes"]
+    )
+    assert verifier.verify("1234")
+
+    # The stored codes are kept when no codes are entered
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_VERIFY_CODES: True}
+    )
+    await hass.async_block_till_done()
+    assert result.get("type") is FlowResultType.CREATE_ENTRY
+    assert config_entry.options["code_hashes"] == sorted(verifier.hashes)
+
+    # The stored codes are removed when codes are no longer checked
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_VERIFY_CODES: False}
+    )
+    await hass.async_block_till_done()
+    assert result.get("type") is FlowResultType.CREATE_ENTRY
+    assert "code_hashes" not in config_entry.options
+    assert "code_salt" not in config_entry.options
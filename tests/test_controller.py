@@ -0,0 +1,265 @@
+"""Tests for the per controller command queues."""
+
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ring_keypad.controller import ControllerQueue, Priority
+from custom_components.ring_keypad.dispatch import CommandDispatcher, CommandRequest
+
+# Seconds the simulated controller takes to send each command
+AIRTIME = 0.001
+COMMAND = {
+    "command_class": "135",
+    "endpoint": 0,
+    "property": 98,
+    "property_key": 9,
+    "value": 100,
+}
+
+
+def create_keypad(hass: HomeAssistant, config_entry: MockConfigEntry, node: int) -> str:
+    """Create a keypad device on a Z-Wave JS controller and return its id."""
+    device_entry = dr.async_get(hass).async_get_or_create(
+        config_entry_id=config_entry.entry_id,
+        identifiers={("zwave_js", f"{config_entry.entry_id}-{node}")},
+    )
+    return device_entry.id
+
+
+@pytest.fixture(name="controllers")
+def mock_controllers(hass: HomeAssistant) -> tuple[MockConfigEntry, MockConfigEntry]:
+    """Fixture for two Z-Wave JS controllers."""
+    entries = (MockConfigEntry(domain="zwave_js"), MockConfigEntry(domain="zwave_js"))
+    for entry in entries:
+        entry.add_to_hass(hass)
+    return entries
+
+
+async def test_congested_controller(
+    hass: HomeAssistant, controllers: tuple[MockConfigEntry, MockConfigEntry]
+) -> None:
+    """Test a blocked controller does not delay keypads on another controller."""
+    first = create_keypad(hass, controllers[0], 2)
+    second = create_keypad(hass, controllers[1], 2)
+    release = asyncio.Event()
+    calls: list[list[str]] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call.data["device_id"])
+        if first in call.data["device_id"]:
+            await release.wait()
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    dispatcher = CommandDispatcher(hass, controller_concurrency=1)
+
+    blocked = hass.async_create_background_task(
+        dispatcher.async_send(CommandRequest((first, second), COMMAND)), "blocked"
+    )
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    # The keypad on the second controller was sent its command
+    assert calls == [[first], [second]]
+    assert not blocked.done()
+
+    # Commands to the second controller are not queued behind the first
+    await dispatcher.async_send(CommandRequest((second,), {**COMMAND, "value": 1}))
+    assert len(calls) == 3
+
+    queued = hass.async_create_background_task(
+        dispatcher.async_send(CommandRequest((first,), {**COMMAND, "value": 1})),
+        "queued",
+    )
+    await asyncio.sleep(0)
+    first_queue = dispatcher.controllers[controllers[0].entry_id]
+    assert first_queue.queued == 1
+    assert len(calls) == 3
+
+    release.set()
+    await blocked
+    await queued
+    assert calls[3] == [first]
+    assert first_queue.queued == 0
+    assert first_queue.commands_sent == 2
+    assert dispatcher.controllers[controllers[1].entry_id].commands_sent == 2
+
+
+async def test_controller_failure(
+    hass: HomeAssistant, controllers: tuple[MockConfigEntry, MockConfigEntry]
+) -> None:
+    """Test a failing controller still sends to the other controller."""
+    first = create_keypad(hass, controllers[0], 2)
+    second = create_keypad(hass, controllers[1], 2)
+    calls: list[list[str]] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call.data["device_id"])
+        if first in call.data["device_id"]:
+            raise HomeAssistantError("Controller restarting")
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    dispatcher = CommandDispatcher(hass)
+
+    with pytest.raises(HomeAssistantError, match="Controller restarting"):
+        await dispatcher.async_send(CommandRequest((first, second), COMMAND))
+    assert sorted(calls) == sorted([[first], [second]])
+    assert dispatcher.controllers[controllers[0].entry_id].failures == 1
+    assert dispatcher.controllers[controllers[1].entry_id].commands_sent == 1
+
+
+async def test_unknown_device(hass: HomeAssistant) -> None:
+    """Test devices not in the registry share a queue."""
+    calls: list[list[str]] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call.data["device_id"])
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    dispatcher = CommandDispatcher(hass)
+
+    await dispatcher.async_send(CommandRequest(("a", "b"), COMMAND))
+    assert calls == [["a", "b"]]
+    assert list(dispatcher.controllers) == [None]
+
+
+async def test_wait_time(hass: HomeAssistant) -> None:
+    """Test the time spent waiting for the controller is recorded."""
+    queue = ControllerQueue(hass, "controller", concurrency=1)
+    release = asyncio.Event()
+
+    first = hass.async_create_background_task(queue.async_run(release.wait), "first")
+    await asyncio.sleep(0)
+
+    async def send() -> None:
+        pass
+
+    second = hass.async_create_background_task(queue.async_run(send), "second")
+    await asyncio.sleep(0.01)
+    assert queue.queued == 1
+    release.set()
+    await first
+    await second
+    assert queue.commands_sent == 2
+    assert queue.wait_time >= 0.01
+
+
+class SimulatedController:
+    """A controller that sends one command at a time and records the order."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize SimulatedController."""
+        self.queue = ControllerQueue(hass, "controller", concurrency=1)
+        self.sent: list[str] = []
+        self._hass = hass
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def submit(self, keypad: str, priority: Priority = Priority.COMMAND) -> None:
+        """Queue a command for a keypad."""
+
+        async def send() -> None:
+            await asyncio.sleep(AIRTIME)
+            self.sent.append(keypad)
+
+        self._tasks.append(
+            self._hass.async_create_background_task(
+                self.queue.async_run(send, (keypad,), priority), keypad
+            )
+        )
+
+    async def async_drain(self) -> None:
+        """Wait for every submitted command to be sent."""
+        await asyncio.gather(*self._tasks)
+
+
+async def test_fair_share_with_skewed_load(hass: HomeAssistant) -> None:
+    """Test a keypad flooded with commands does not starve the others."""
+    controller = SimulatedController(hass)
+    for _ in range(40):
+        controller.submit("spam")
+    await asyncio.sleep(0)
+    for _ in range(3):
+        for keypad in ("a", "b", "c"):
+            controller.submit(keypad)
+    await controller.async_drain()
+
+    assert len(controller.sent) == 49
+    # The quiet keypads take turns with the flooded keypad instead of waiting
+    # for all of its commands
+    last_quiet = max(
+        index for index, keypad in enumerate(controller.sent) if keypad != "spam"
+    )
+    assert last_quiet < 13
+    assert controller.sent[:9] == [
+        "spam", "spam", "a", "b", "c", "spam", "a", "b", "c"
+    ]  # fmt: skip
+
+    keypads = controller.queue.keypads
+    assert keypads["spam"].commands == 40
+    assert keypads["a"].commands == 3
+    for keypad in ("a", "b", "c"):
+        assert keypads[keypad].max_wait < keypads["spam"].max_wait / 2
+    assert controller.queue.queued == 0
+
+
+async def test_priority_lanes(hass: HomeAssistant) -> None:
+    """Test higher priority lanes are served first."""
+    controller = SimulatedController(hass)
+    controller.submit("a")
+    await asyncio.sleep(0)
+    controller.submit("a", Priority.REFRESH)
+    controller.submit("b", Priority.COMMAND)
+    controller.submit("c", Priority.ALARM_STATE)
+    await controller.async_drain()
+    assert controller.sent == ["a", "c", "b", "a"]
+
+
+async def test_cancelled_while_queued(hass: HomeAssistant) -> None:
+    """Test a cancelled command gives up its place in the queue."""
+    controller = SimulatedController(hass)
+    controller.submit("a")
+    controller.submit("b")
+    controller.submit("c")
+    await asyncio.sleep(0)
+    assert controller.queue.queued == 2
+    controller._tasks[1].cancel()
+    await asyncio.sleep(0)
+    assert controller.queue.queued == 1
+    del controller._tasks[1]
+    await controller.async_drain()
+    assert controller.sent == ["a", "c"]
+
+
+async def test_cancelled_after_release(hass: HomeAssistant) -> None:
+    """Test a command cancelled just before its turn is skipped."""
+    queue = ControllerQueue(hass, "controller", concurrency=1)
+    event = asyncio.Event()
+    sent: list[str] = []
+
+    async def send_a() -> None:
+        await event.wait()
+        sent.append("a")
+
+    async def send(keypad: str) -> None:
+        sent.append(keypad)
+
+    task_a = hass.async_create_task(queue.async_run(send_a, ("a",)))
+    task_b = hass.async_create_task(queue.async_run(lambda: send("b"), ("b",)))
+    await asyncio.sleep(0)
+    assert queue.queued == 1
+
+    # The command finishes and releases its slot before the cancelled
+    # command's task gets to leave the queue
+    event.set()
+    task_b.cancel()
+    await task_a
+    with pytest.raises(asyncio.CancelledError):
+        await task_b
+
+    assert queue.queued == 0
+    assert not any(queue._lanes)
+    await queue.async_run(lambda: send("c"), ("c",))
+    assert sent == ["a", "c"]
@@ -0,0 +1,45 @@
+"""Tests for decoding Ring Keypad notifications."""
+
+import dataclasses
+
+import pytest
+
+from custom_components.ring_keypad.decoder import KeypadDecoder, KeypadEvent
+
+
+def test_decode() -> None:
+    """Test decoding a notification into a keypad event."""
+    decoder = KeypadDecoder()
+
+    keypad_event = decoder.decode(
+        {"event_type": 2, "event_data": "1234", "sequence_number": 7}
+    )
+    assert keypad_event == KeypadEvent(
+        event_type=2,
+        button="code_entered",
+        entity_event_type="alarm_disarm",
+        code="1234",
+        sequence_number=7,
+    )
+    # A retransmit decodes to an equal event
+    assert keypad_event == decoder.decode(
+        {"event_type": 2, "event_data": "1234", "sequence_number": 7}
+    )
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        keypad_event.code = "4321"  # type: ignore[misc]
+    assert not hasattr(keypad_event, "__dict__")
+
+    assert decoder.decode({"event_data": "1234"}) is None
+
+
+def test_unknown_event_types(caplog: pytest.LogCaptureFixture) -> None:
+    """Test unknown event types are logged once and counted up to a limit."""
+    decoder = KeypadDecoder(max_unknown=2)
+
+    for event_type in (100, 100, 101, 102, 100, 102):
+        assert decoder.decode({"event_type": event_type}) is None
+
+    assert decoder.unknown_event_types == {100: 3, 101: 1}
+    assert caplog.text.count("unknown event type: 100") == 1
+    assert "unknown event type: 101" in caplog.text
+    assert "unknown event type: 102" not in caplog.text
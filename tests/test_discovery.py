@@ -0,0 +1,104 @@
+"""Tests for discovery and onboarding of Ring Keypads."""
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.discovery import async_unconfigured_keypads
+
+
+def create_device(
+    device_registry: dr.DeviceRegistry,
+    config_entry: MockConfigEntry,
+    node_id: int,
+    manufacturer: str = "Ring",
+    model: str = "4AK1SZ",
+) -> str:
+    """Create a Z-Wave JS device and return its id."""
+    return device_registry.async_get_or_create(
+        config_entry_id=config_entry.entry_id,
+        identifiers={("zwave_js", f"{config_entry.entry_id}-{node_id}")},
+        name=f"Node {node_id}",
+        manufacturer=manufacturer,
+        model=model,
+    ).id
+
+
+@pytest.fixture(name="keypad_ids")
+def mock_keypad_ids(
+    hass: HomeAssistant,
+    device_registry: dr.DeviceRegistry,
+    zwave_config_entry: MockConfigEntry,
+) -> list[str]:
+    """Fixture for Ring Keypads and other devices on two Z-Wave JS networks."""
+    other_network = MockConfigEntry(domain="zwave_js")
+    other_network.add_to_hass(hass)
+    create_device(device_registry, zwave_config_entry, 2, model="4AC1SZ")
+    create_device(device_registry, zwave_config_entry, 3, manufacturer="Zooz")
+    other_integration = MockConfigEntry(domain="ring")
+    other_integration.add_to_hass(hass)
+    create_device(device_registry, other_integration, 4)
+    return [
+        create_device(device_registry, zwave_config_entry, 5),
+        create_device(device_registry, zwave_config_entry, 6, model="Keypad v2"),
+        create_device(device_registry, other_network, 7),
+    ]
+
+
+async def test_unconfigured_keypads(hass: HomeAssistant, keypad_ids: list[str]) -> None:
+    """Test only keypads without a config entry are found."""
+    assert sorted(entry.id for entry in async_unconfigured_keypads(hass)) == sorted(
+        keypad_ids
+    )
+
+    MockConfigEntry(domain=DOMAIN, options={CONF_DEVICE_ID: keypad_ids[0]}).add_to_hass(
+        hass
+    )
+    assert sorted(entry.id for entry in async_unconfigured_keypads(hass)) == sorted(
+        keypad_ids[1:]
+    )
+
+
+async def test_onboard_service(hass: HomeAssistant, keypad_ids: list[str]) -> None:
+    """Test every unconfigured keypad is added and set up in one call."""
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    response = await hass.services.async_call(
+        DOMAIN, "onboard", blocking=True, return_response=True
+    )
+    assert response is not None
+    assert sorted(response["device_ids"]) == sorted(keypad_ids)
+
+    entries = hass.config_entries.async_entries(DOMAIN)
+    assert sorted(entry.options[CONF_DEVICE_ID] for entry in entries) == sorted(
+        keypad_ids
+    )
+    assert all(entry.state is ConfigEntryState.LOADED for entry in entries)
+    assert sorted(entry.title for entry in entries) == ["Node 5", "Node 6", "Node 7"]
+    assert len(hass.states.async_entity_ids("event")) == 3
+
+    # Calling again finds nothing left to add
+    response = await hass.services.async_call(
+        DOMAIN, "onboard", blocking=True, return_response=True
+    )
+    assert response == {"device_ids": []}
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 3
+
+
+async def test_import_already_configured(
+    hass: HomeAssistant, keypad_ids: list[str]
+) -> None:
+    """Test a keypad that is already configured is not added twice."""
+    MockConfigEntry(domain=DOMAIN, options={CONF_DEVICE_ID: keypad_ids[0]}).add_to_hass(
+        hass
+    )
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": "import"}, data={CONF_DEVICE_ID: keypad_ids[0]}
+    )
+    assert result["type"] == "abort"
+    assert result["reason"] == "already_configured"
@@ -0,0 +1,351 @@
+"""Tests for the Ring Keypad command dispatcher."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.controller import Priority
+from custom_components.ring_keypad.dispatch import (
+    DATA_DISPATCHER,
+    CommandDispatcher,
+    CommandRequest,
+    CommandSuperseded,
+)
+
+DEVICE_ID = "8f4219cfa57e23f6f669c4616c2205e2"
+SLOW_NODE_DELAY = 5
+COMMAND = {
+    "command_class": "135",
+    "endpoint": 0,
+    "property": 98,
+    "property_key": 9,
+    "value": 100,
+}
+
+
+@pytest.fixture(name="config")
+def mock_config() -> dict[str, Any]:
+    """Fixture for the integration yaml configuration."""
+    return {}
+
+
+@pytest.fixture(autouse=True)
+async def mock_setup_integration(hass: HomeAssistant, config: dict[str, Any]) -> None:
+    """Setup the integration"""
+    assert await async_setup_component(hass, DOMAIN, config)
+    await hass.async_block_till_done()
+
+
+async def call_chime(hass: HomeAssistant, chime: str = "wind_chime") -> None:
+    """Call the chime service for the test device."""
+    await hass.services.async_call(
+        DOMAIN,
+        "chime",
+        service_data={"chime": chime},
+        blocking=True,
+        target={"device_id": [DEVICE_ID]},
+    )
+
+
+async def test_identical_calls(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test identical calls within the window send a single command."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    await call_chime(hass)
+    await call_chime(hass)
+    assert len(set_value) == 1
+
+    # A different command is sent
+    await call_chime(hass, "doorbell")
+    assert len(set_value) == 2
+
+    # The same command is sent again once the window has passed
+    freezer.tick(1)
+    await call_chime(hass)
+    assert len(set_value) == 3
+
+
+async def test_interleaved_calls(hass: HomeAssistant) -> None:
+    """Test a command is sent again after a different command in between."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    for alarm_state in ("disarmed", "armed_away", "disarmed"):
+        await hass.services.async_call(
+            DOMAIN,
+            "update_alarm_state",
+            service_data={"alarm_state": alarm_state},
+            blocking=True,
+            target={"device_id": [DEVICE_ID]},
+        )
+    assert [call.data["property"] for call in set_value] == [2, 11, 2]
+
+    await call_chime(hass)
+    await call_chime(hass, "doorbell")
+    await call_chime(hass)
+    assert len(set_value) == 6
+
+
+@pytest.mark.parametrize("config", [{DOMAIN: {"idempotency_window": 0}}])
+async def test_window_disabled(hass: HomeAssistant) -> None:
+    """Test every call is sent when the window is disabled."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    await call_chime(hass)
+    await call_chime(hass)
+    assert len(set_value) == 2
+
+
+async def test_in_flight_calls(hass: HomeAssistant) -> None:
+    """Test concurrent identical calls share the in flight command."""
+    release = asyncio.Event()
+    calls: list[ServiceCall] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call)
+        await release.wait()
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+
+    tasks = [hass.async_create_task(call_chime(hass)) for _ in range(3)]
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert not any(task.done() for task in tasks)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert len(calls) == 1
+
+
+async def test_failures_not_cached(hass: HomeAssistant) -> None:
+    """Test a failed command is retried by the next call."""
+    calls: list[ServiceCall] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call)
+        if len(calls) == 1:
+            raise HomeAssistantError("Node timeout")
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+
+    with pytest.raises(HomeAssistantError, match="Node timeout"):
+        await call_chime(hass)
+    await call_chime(hass)
+    assert len(calls) == 2
+
+
+async def test_lru_eviction(hass: HomeAssistant) -> None:
+    """Test the least recently used commands are evicted from the cache."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    dispatcher = CommandDispatcher(hass, idempotency_window=10, max_entries=2)
+
+    await dispatcher.async_send(CommandRequest(("a",), COMMAND))
+    await dispatcher.async_send(CommandRequest(("b",), COMMAND))
+    await dispatcher.async_send(CommandRequest(("a",), COMMAND))
+    assert len(set_value) == 2
+
+    # Evicts "b" which was least recently used
+    await dispatcher.async_send(CommandRequest(("c",), COMMAND))
+    await dispatcher.async_send(CommandRequest(("a",), COMMAND))
+    assert len(set_value) == 3
+    await dispatcher.async_send(CommandRequest(("b",), COMMAND))
+    assert len(set_value) == 4
+    assert dispatcher.idempotent_hits == 2
+    assert dispatcher.commands_sent == 4
+
+
+async def test_pipeline_timing(hass: HomeAssistant) -> None:
+    """Test pipelined steps are scheduled from the start without drift."""
+    sent: list[float] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        sent.append(hass.loop.time())
+        await asyncio.sleep(0.05)
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    dispatcher = CommandDispatcher(hass)
+
+    start = hass.loop.time()
+    results = await dispatcher.async_send_pipeline(
+        [
+            (0, CommandRequest(("a",), COMMAND)),
+            (0.1, CommandRequest(("a",), {**COMMAND, "value": 50})),
+            (0.1, CommandRequest(("a",), {**COMMAND, "value": 25})),
+        ]
+    )
+    assert results == [None, None, None]
+    offsets = [timestamp - start for timestamp in sent]
+    # Each step starts at its scheduled offset rather than after the previous
+    # step's wait plus the time it took to send.
+    assert offsets[1] == pytest.approx(0.1, abs=0.04)
+    assert offsets[2] == pytest.approx(0.2, abs=0.04)
+
+
+async def test_disarm_supersedes_countdown(hass: HomeAssistant) -> None:
+    """Benchmark the time to announce disarmed during an exit delay.
+
+    The simulated node is slow to respond to the exit delay command, and the
+    disarm is sent as soon as it arrives instead of waiting behind it.
+    """
+    sent: list[tuple[int, float]] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        sent.append((call.data["property"], hass.loop.time()))
+        if call.data["property"] == 18:  # Exit delay
+            await asyncio.sleep(SLOW_NODE_DELAY)
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+
+    start = hass.loop.time()
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "arming", "delay": 60},
+        blocking=True,
+        target={"device_id": [DEVICE_ID]},
+    )
+    await asyncio.sleep(0)
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "disarmed"},
+        blocking=True,
+        target={"device_id": [DEVICE_ID]},
+    )
+    await hass.async_block_till_done()
+
+    assert [prop for prop, _ in sent] == [18, 2]
+    time_to_disarm = sent[1][1] - start
+    assert time_to_disarm < SLOW_NODE_DELAY / 10
+    assert hass.data[DATA_DISPATCHER].countdowns_superseded == 1
+
+
+async def test_pipeline_countdown_superseded(hass: HomeAssistant) -> None:
+    """Test an exit delay step of a pipeline is superseded by a disarm."""
+    sent: list[int] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        sent.append(call.data["property"])
+        if call.data["property"] == 18:  # Exit delay
+            await asyncio.sleep(SLOW_NODE_DELAY)
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    dispatcher = CommandDispatcher(hass)
+
+    exit_delay = CommandRequest(
+        ("a",),
+        {**COMMAND, "property": 18, "property_key": "timeout", "value": "1m0s"},
+        alarm_state="arming",
+    )
+    assert exit_delay.priority is Priority.ALARM_STATE
+    pipeline = hass.async_create_task(dispatcher.async_send_pipeline([(0, exit_delay)]))
+    await asyncio.sleep(0)
+    await dispatcher.async_send_alarm_state(
+        CommandRequest(("a",), {**COMMAND, "property": 2}, alarm_state="disarmed")
+    )
+    (result,) = await pipeline
+
+    assert isinstance(result, CommandSuperseded)
+    assert sent == [18, 2]
+    assert dispatcher.countdowns_superseded == 1
+    assert dispatcher.shadow["a"].command["property"] == 2
+
+
+async def test_pipeline_countdown_awaited(hass: HomeAssistant) -> None:
+    """Test a countdown step is sent before the next step and reports failures."""
+    calls: list[str] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(f"start {call.data['property']}")
+        if call.data["property"] == 18:  # Exit delay
+            await asyncio.sleep(0.05)
+            calls.append("fail 18")
+            raise HomeAssistantError("Node timeout")
+        calls.append(f"done {call.data['property']}")
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    dispatcher = CommandDispatcher(hass)
+
+    exit_delay = CommandRequest(
+        ("a",),
+        {**COMMAND, "property": 18, "property_key": "timeout", "value": "1m0s"},
+        alarm_state="arming",
+    )
+    results = await dispatcher.async_send_pipeline(
+        [(0, exit_delay), (0, CommandRequest(("a",), {**COMMAND, "property": 100}))]
+    )
+
+    assert calls == ["start 18", "fail 18", "start 100", "done 100"]
+    assert isinstance(results[0], HomeAssistantError)
+    assert str(results[0]) == "Node timeout"
+    assert results[1] is None
+
+
+async def test_countdown_not_superseded(hass: HomeAssistant) -> None:
+    """Test a countdown to other keypads is not superseded."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "pending", "delay": 30},
+        blocking=True,
+        target={"device_id": [DEVICE_ID]},
+    )
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "disarmed"},
+        blocking=True,
+        target={"device_id": ["other-device-id"]},
+    )
+    await hass.async_block_till_done()
+
+    assert len(set_value) == 2
+    assert hass.data[DATA_DISPATCHER].countdowns_superseded == 0
+
+
+async def test_parked_until_ready(hass: HomeAssistant) -> None:
+    """Test commands to a dead node are parked and flushed when it is alive."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    dispatcher = CommandDispatcher(hass)
+    dispatcher.async_set_node_status("a", "dead")
+
+    for alarm_state, prop in (("armed_away", 11), ("disarmed", 2)):
+        await dispatcher.async_send_alarm_state(
+            CommandRequest(
+                ("a", "b"),
+                {**COMMAND, "property": prop},
+                alarm_state=alarm_state,
+            )
+        )
+    await dispatcher.async_send(CommandRequest(("a",), COMMAND))
+    # Only the node that is ready receives the commands
+    assert [call.data["device_id"] for call in set_value] == [["b"], ["b"]]
+    assert dispatcher.commands_parked == 3
+    assert dispatcher.shadow["a"].confirmed is None
+
+    dispatcher.async_set_node_status("a", "asleep")
+    await hass.async_block_till_done()
+    assert len(set_value) == 2
+
+    # The latest alarm state wins over the earlier one
+    dispatcher.async_set_node_status("a", "alive")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert [
+        (call.data["device_id"], call.data["property"]) for call in set_value[2:]
+    ] == [(["a"], 2), (["a"], COMMAND["property"])]
+    assert dispatcher.shadow["a"].confirmed is not None
+
+    dispatcher.async_set_node_status("a", "dead")
+    dispatcher.async_set_node_status("a", "alive")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(set_value) == 4
@@ -1,12 +1,25 @@
 """Tests for the Event Ring Keypad platform."""
 
+import time
+from typing import Any
+
 import pytest
 import yaml
-from homeassistant.core import HomeAssistant
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import DATA_DOMAIN_PLATFORM_ENTITIES
 from homeassistant.setup import async_setup_component
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+    async_mock_service,
+)
 
-from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.const import DOMAIN, SIGNAL_KEYPRESS
+from custom_components.ring_keypad.verifier import CodeVerifier
 
 MESSAGE = """
 ---
@@ -24,6 +37,14 @@ data_type_label: None
 event_data: {event_data}
 """
 
+BENCHMARK_KEYPRESSES = 2000
+# Keypresses without state writes take about a third of the time of keypresses
+# with them. The check compares the wall clock time of two runs, so it only
+# fails when skipping state writes takes twice as long as writing them, which
+# a busy test runner alone does not cause.
+THROUGHPUT_MARGIN = 2.0
+VERIFIER = CodeVerifier.from_codes(["1234"])
+
 
 @pytest.fixture(autouse=True)
 async def mock_setup_integration(
@@ -74,7 +95,7 @@ async def test_event_message(
             MESSAGE.format(
                 device_id=zwave_device_id,
                 event_type=event_type,
-                event_data=f'"{event_data}"' if event_data else "null",
+                event_data=f'"{event_data}"' if event_data is not None else "null",
             ),
             Loader=yaml.Loader,
         ),
@@ -105,3 +126,436 @@ async def test_invalid_device_id(hass: HomeAssistant) -> None:
     state = hass.states.get("event.device_name_button")
     assert state is not None
     assert state.state == "unknown"
+
+
+def capture_keypresses(hass: HomeAssistant) -> list[dict[str, Any]]:
+    """Capture the keypress signals sent by the keypads."""
+    keypresses: list[dict[str, Any]] = []
+
+    @callback
+    def async_keypress(data: dict[str, Any]) -> None:
+        keypresses.append(data)
+
+    async_dispatcher_connect(hass, SIGNAL_KEYPRESS, async_keypress)
+    return keypresses
+
+
+def fire_keypad_event(
+    hass: HomeAssistant, device_id: str, event_type: int, event_data: str | None
+) -> None:
+    """Fire a Z-Wave Entry Control notification for the keypad."""
+    hass.bus.async_fire(
+        "zwave_js_notification",
+        yaml.load(
+            MESSAGE.format(
+                device_id=device_id,
+                event_type=event_type,
+                event_data=f'"{event_data}"' if event_data is not None else "null",
+            ),
+            Loader=yaml.Loader,
+        ),
+    )
+
+
+async def test_code_not_recorded(hass: HomeAssistant, zwave_device_id: str) -> None:
+    """Test the entered code is excluded from the recorder."""
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("code") == "1234"
+    assert state.state_info
+    assert "code" in state.state_info["unrecorded_attributes"]
+
+
+@pytest.mark.parametrize(
+    "config_entry_options", [{"suppress_events": ["code_started", "code_timeout"]}]
+)
+async def test_suppress_events(hass: HomeAssistant, zwave_device_id: str) -> None:
+    """Test suppressed keypad events do not update the entity."""
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    fire_keypad_event(hass, zwave_device_id, 0, None)
+    fire_keypad_event(hass, zwave_device_id, 1, None)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.state == "unknown"
+    assert not events
+
+    fire_keypad_event(hass, zwave_device_id, 25, None)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("button") == "code_cancel"
+    assert len(events) == 1
+
+
+@pytest.mark.parametrize("config_entry_options", [{"coalesce_pressed": 2}])
+async def test_coalesce_pressed(
+    hass: HomeAssistant, zwave_device_id: str, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test bursts of pressed events are coalesced into fewer state writes."""
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    # A burst of 5 pressed events writes the first and the most recent
+    for event_type in (0, 1, 0, 1, 25):
+        fire_keypad_event(hass, zwave_device_id, event_type, None)
+        await hass.async_block_till_done()
+
+    assert len(events) == 1
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("button") == "code_started"
+
+    freezer.tick(3)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert len(events) == 2
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("button") == "code_cancel"
+
+    # Alarm events are always written immediately
+    fire_keypad_event(hass, zwave_device_id, 5, None)
+    await hass.async_block_till_done()
+
+    assert len(events) == 3
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("event_type") == "alarm_arm_away"
+
+
+async def test_duplicate_notifications(
+    hass: HomeAssistant, zwave_device_id: str, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test retransmitted notifications are dropped."""
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    fire_keypad_event(hass, zwave_device_id, 5, None)
+    fire_keypad_event(hass, zwave_device_id, 5, None)
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.duplicates_suppressed == 1
+
+    # Different event data is not a duplicate
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    fire_keypad_event(hass, zwave_device_id, 2, "4321")
+    await hass.async_block_till_done()
+    assert len(events) == 3
+
+    # The same press after the window is a new event
+    freezer.tick(2)
+    fire_keypad_event(hass, zwave_device_id, 2, "4321")
+    await hass.async_block_till_done()
+    assert len(events) == 4
+    assert entity.duplicates_suppressed == 1
+
+
+@pytest.mark.parametrize(
+    "config_entry_options", [{"keypress_event": True, "state_writes": "off"}]
+)
+async def test_keypress_event(hass: HomeAssistant, zwave_device_id: str) -> None:
+    """Test keypresses are sent as signals without updating the entity."""
+
+    keypresses = capture_keypresses(hass)
+    bus_keypresses = async_capture_events(hass, "ring_keypad_keypress")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    fire_keypad_event(hass, zwave_device_id, 6, None)
+    await hass.async_block_till_done()
+
+    assert keypresses == [
+        {
+            "device_id": zwave_device_id,
+            "event_type": "alarm_disarm",
+            "button": "code_entered",
+            "code": "1234",
+        },
+        {
+            "device_id": zwave_device_id,
+            "event_type": "alarm_arm_home",
+            "button": "arm_stay",
+            "code": None,
+        },
+    ]
+    # Nothing reaches the bus, so the recorder never stores the code
+    assert not bus_keypresses
+    assert not events
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.state == "unknown"
+
+
+@pytest.mark.parametrize("config_entry_options", [{"state_writes": "rate_limited"}])
+async def test_state_writes_rate_limited(
+    hass: HomeAssistant, zwave_device_id: str, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test pressed events are rate limited and alarm events are always written."""
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    for event_type in (0, 1, 25):
+        fire_keypad_event(hass, zwave_device_id, event_type, None)
+        await hass.async_block_till_done()
+
+    assert len(events) == 1
+
+    for event_type, event_data in ((3, "1234"), (6, None)):
+        fire_keypad_event(hass, zwave_device_id, event_type, event_data)
+        await hass.async_block_till_done()
+
+    assert len(events) == 3
+    assert events[1].data["new_state"].attributes.get("event_type") == ("alarm_disarm")
+    assert events[1].data["new_state"].attributes.get("code") == "1234"
+
+    # The pressed event still waiting is replaced by the alarm events
+    freezer.tick(2)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert len(events) == 3
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("event_type") == "alarm_arm_home"
+
+
+@pytest.mark.parametrize(
+    "config_entry_options", [{"max_code_attempts": 3, "code_lockout": 300}]
+)
+async def test_code_attempt_lockout(
+    hass: HomeAssistant, zwave_device_id: str, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test codes entered after too many attempts are dropped."""
+
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    for code in ("1111", "2222", "3333", "4444", "5555"):
+        fire_keypad_event(hass, zwave_device_id, 2, code)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(events) == 3
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("code") == "3333"
+    # The keypad plays the invalid code message for dropped attempts
+    assert len(set_value) == 1
+    assert set_value[0].data["property"] == 9
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.code_attempts_dropped == 2
+
+    # Other buttons are not affected by the lockout
+    fire_keypad_event(hass, zwave_device_id, 5, None)
+    await hass.async_block_till_done()
+    assert len(events) == 4
+
+    freezer.tick(301)
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    await hass.async_block_till_done()
+    assert len(events) == 5
+
+
+@pytest.mark.parametrize(
+    "config_entry_options", [{"max_code_attempts": 3, "code_lockout": 300}]
+)
+async def test_code_attempt_lockout_arm_buttons(
+    hass: HomeAssistant, zwave_device_id: str
+) -> None:
+    """Test codes entered with the disarm and arm buttons count as attempts."""
+
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    for event_type, code in ((3, "1111"), (5, "2222"), (6, "3333"), (3, "4444")):
+        fire_keypad_event(hass, zwave_device_id, event_type, code)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(events) == 3
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("event_type") == "alarm_arm_home"
+    assert state.attributes.get("code") == "3333"
+    assert len(set_value) == 1
+    assert set_value[0].data["property"] == 9
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.code_attempts_dropped == 1
+
+
+@pytest.mark.parametrize("config_entry_options", [{"max_code_attempts": 1}])
+async def test_arm_button_without_code(
+    hass: HomeAssistant, zwave_device_id: str
+) -> None:
+    """Test arm buttons pressed without a code are not code attempts."""
+
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    for event_type in (5, 6, 5):
+        fire_keypad_event(hass, zwave_device_id, event_type, "")
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(events) == 3
+    assert not set_value
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.code_attempts_dropped == 0
+
+
+@pytest.mark.parametrize(
+    "config_entry_options",
+    [
+        {
+            "max_code_attempts": 2,
+            "code_salt": VERIFIER.salt,
+            "code_hashes": sorted(VERIFIER.hashes),
+        }
+    ],
+)
+async def test_verify_codes(hass: HomeAssistant, zwave_device_id: str) -> None:
+    """Test the invalid code message is played right away for a wrong code."""
+
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1111")
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    # The code is still passed on to the panel
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("code") == "1111"
+    assert len(set_value) == 1
+    assert set_value[0].data["property"] == 9
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("code") == "1234"
+    assert len(set_value) == 1
+
+    # The valid code reset the attempts, so this is not locked out
+    fire_keypad_event(hass, zwave_device_id, 2, "2222")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("code") == "2222"
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.invalid_codes == 2
+    assert entity.code_attempts_dropped == 0
+
+
+@pytest.mark.parametrize(
+    "config_entry_options",
+    [{"code_salt": VERIFIER.salt, "code_hashes": sorted(VERIFIER.hashes)}],
+)
+@pytest.mark.parametrize("event_type", [3, 5, 6])
+async def test_verify_codes_arm_buttons(
+    hass: HomeAssistant, zwave_device_id: str, event_type: int
+) -> None:
+    """Test a wrong code entered with the disarm or arm buttons is rejected."""
+
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    fire_keypad_event(hass, zwave_device_id, event_type, "1111")
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(set_value) == 1
+    assert set_value[0].data["property"] == 9
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.invalid_codes == 1
+
+
+@pytest.mark.parametrize(
+    "config_entry_options",
+    [{"code_salt": VERIFIER.salt, "code_hashes": sorted(VERIFIER.hashes)}],
+)
+async def test_verify_codes_without_code(
+    hass: HomeAssistant, zwave_device_id: str
+) -> None:
+    """Test arm away pressed without a code does not play the invalid code."""
+
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    fire_keypad_event(hass, zwave_device_id, 5, "")
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert not set_value
+    state = hass.states.get("event.device_name_button")
+    assert state is not None
+    assert state.attributes.get("event_type") == "alarm_arm_away"
+    entity = hass.data[DATA_DOMAIN_PLATFORM_ENTITIES][("event", DOMAIN)][
+        "event.device_name_button"
+    ]
+    assert entity.invalid_codes == 0
+
+
+async def measure_keypresses(hass: HomeAssistant, device_id: str) -> float:
+    """Return the event loop time in seconds per keypress."""
+    # Unique codes so no keypress is dropped as a duplicate
+    notifications = [
+        yaml.load(
+            MESSAGE.format(device_id=device_id, event_type=2, event_data=f'"{index}"'),
+            Loader=yaml.Loader,
+        )
+        for index in range(BENCHMARK_KEYPRESSES)
+    ]
+    start = time.perf_counter()
+    for notification in notifications:
+        hass.bus.async_fire("zwave_js_notification", notification)
+    await hass.async_block_till_done()
+    return (time.perf_counter() - start) / BENCHMARK_KEYPRESSES
+
+
+async def test_keypress_throughput(
+    hass: HomeAssistant, zwave_device_id: str, config_entry: MockConfigEntry
+) -> None:
+    """Benchmark keypresses per second with and without entity state writes."""
+    states = async_capture_events(hass, EVENT_STATE_CHANGED)
+    state_writes = await measure_keypresses(hass, zwave_device_id)
+    assert len(states) == BENCHMARK_KEYPRESSES
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            "keypress_event": True,
+            "state_writes": "off",
+        },
+    )
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    states.clear()
+    keypresses = capture_keypresses(hass)
+    keypress_only = await measure_keypresses(hass, zwave_device_id)
+    assert len(keypresses) == BENCHMARK_KEYPRESSES
+    assert not states
+
+    # Skipping the state machine leaves only the signal per keypress
+    assert keypress_only < state_writes * THROUGHPUT_MARGIN, (
+        f"{1 / keypress_only:.0f} keypresses/s without state writes, "
+        f"{1 / state_writes:.0f} keypresses/s with state writes"
+    )
@@ -0,0 +1,155 @@
+"""Tests for Ring Keypad groups."""
+
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.group import DATA_GROUPS, KeypadGroups
+
+FRONT_DOOR = "8f4219cfa57e23f6f669c4616c2205e2"
+BACK_DOOR = "0f7c1ba8e2ef1b9ad5d3b7b4b1ec0a9c"
+GARAGE = "5e2d7c4a1b9f3e8d6c0a2b4f6e8d0c1a"
+CONFIG = {
+    DOMAIN: {
+        "groups": {
+            "entry_doors": [FRONT_DOOR, BACK_DOOR],
+            "house": [FRONT_DOOR, BACK_DOOR, GARAGE],
+            "empty": [],
+        }
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+async def mock_setup_integration(hass: HomeAssistant) -> None:
+    """Setup the integration"""
+    assert await async_setup_component(hass, DOMAIN, CONFIG)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize(
+    ("target", "expected_device_ids"),
+    [
+        ({"group": "entry_doors"}, [FRONT_DOOR, BACK_DOOR]),
+        ({"group": ["entry_doors", "house"]}, [FRONT_DOOR, BACK_DOOR, GARAGE]),
+        (
+            {"device_id": GARAGE, "group": "entry_doors"},
+            [GARAGE, FRONT_DOOR, BACK_DOOR],
+        ),
+    ],
+)
+async def test_group_target(
+    hass: HomeAssistant, target: dict[str, Any], expected_device_ids: list[str]
+) -> None:
+    """Test targeting services at keypad groups."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    await hass.services.async_call(
+        DOMAIN,
+        "chime",
+        service_data={"chime": "doorbell", **target},
+        blocking=True,
+    )
+    assert len(set_value) == 1
+    assert set_value[0].data["device_id"] == expected_device_ids
+
+
+async def test_unknown_group(hass: HomeAssistant) -> None:
+    """Test targeting a group that is not configured."""
+    async_mock_service(hass, "zwave_js", "set_value")
+
+    with pytest.raises(ServiceValidationError, match="Unknown Ring Keypad group"):
+        await hass.services.async_call(
+            DOMAIN,
+            "chime",
+            service_data={"chime": "doorbell", "group": "garden"},
+            blocking=True,
+        )
+
+
+@pytest.mark.parametrize("target", [{"group": []}, {"group": "empty"}])
+async def test_no_keypads_targeted(hass: HomeAssistant, target: dict[str, Any]) -> None:
+    """Test targeting groups without any keypads."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+
+    with pytest.raises(ServiceValidationError, match="No Ring Keypads targeted"):
+        await hass.services.async_call(
+            DOMAIN,
+            "chime",
+            service_data={"chime": "doorbell", **target},
+            blocking=True,
+        )
+    assert not set_value
+
+
+async def test_resolved_groups_cached(hass: HomeAssistant) -> None:
+    """Test groups are resolved once until the device registry changes."""
+    resolver = Mock(side_effect=lambda hass, device_ids: list(device_ids))
+    groups = KeypadGroups(hass, CONFIG[DOMAIN]["groups"], resolver)
+
+    assert groups.async_resolve("house") == (FRONT_DOOR, BACK_DOOR, GARAGE)
+    assert groups.async_resolve("house") == (FRONT_DOOR, BACK_DOOR, GARAGE)
+    assert resolver.call_count == 1
+
+    groups.async_invalidate()
+    assert groups.async_resolve("house") == (FRONT_DOOR, BACK_DOOR, GARAGE)
+    assert resolver.call_count == 2
+
+
+async def test_device_registry_invalidates_groups(
+    hass: HomeAssistant, device_registry: dr.DeviceRegistry
+) -> None:
+    """Test device registry changes clear the resolved groups."""
+    groups = hass.data[DATA_GROUPS]
+    groups.async_resolve("entry_doors")
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        resolver = Mock(side_effect=lambda hass, device_ids: list(device_ids))
+        monkeypatch.setattr(groups, "_resolver", resolver)
+
+        groups.async_resolve("entry_doors")
+        assert not resolver.called
+
+        hass.bus.async_fire(
+            dr.EVENT_DEVICE_REGISTRY_UPDATED,
+            {"action": "create", "device_id": "new-device"},
+        )
+        await hass.async_block_till_done()
+
+        groups.async_resolve("entry_doors")
+        assert resolver.call_count == 1
+
+
+async def test_keypad_loading_invalidates_groups(
+    hass: HomeAssistant, zwave_device_id: str
+) -> None:
+    """Test loading and unloading a keypad clears the resolved groups."""
+    groups = hass.data[DATA_GROUPS]
+    groups.async_resolve("entry_doors")
+    config_entry = MockConfigEntry(
+        data={}, domain=DOMAIN, options={"device_id": zwave_device_id}
+    )
+    config_entry.add_to_hass(hass)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        resolver = Mock(side_effect=lambda hass, device_ids: list(device_ids))
+        monkeypatch.setattr(groups, "_resolver", resolver)
+
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        groups.async_resolve("entry_doors")
+        assert resolver.call_count == 1
+
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+        groups.async_resolve("entry_doors")
+        assert resolver.call_count == 2
@@ -1,10 +1,18 @@
 """Tests for the Ring Keypad component."""
 
+import asyncio
+import time
+from typing import Any
+from unittest.mock import patch
+
 import attr
 import pytest
+import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
     async_mock_service,
@@ -13,6 +21,13 @@ from pytest_homeassistant_custom_component.common import (
 from custom_components.ring_keypad.const import (
     DOMAIN,
 )
+from custom_components.ring_keypad.data import DATA_KEYPADS
+from custom_components.ring_keypad.dispatch import DATA_DISPATCHER
+
+KEYPAD_COUNT = 50
+# Setting up 50 keypads normally takes tens of milliseconds, so the budget only
+# trips when setup time grows badly with the number of keypads.
+STARTUP_BUDGET = 5.0
 
 
 @pytest.fixture(autouse=True)
@@ -73,7 +88,7 @@ async def test_rename_device(
     config_entry: MockConfigEntry,
     device_registry: dr.DeviceRegistry,
 ) -> None:
-    """Test renaming the device and that everything is reloaded."""
+    """Test renaming the device updates the entity without a reload."""
 
     assert len(hass.config_entries.async_entries("ring_keypad")) == 1
     assert config_entry.state == config_entries.ConfigEntryState.LOADED
@@ -87,14 +102,28 @@ async def test_rename_device(
     assert state
     assert state.attributes.get("friendly_name") == "Device name Button"
 
-    device_registry.async_update_device(zwave_device_id, name="Other name")
-    await hass.async_block_till_done()
+    with patch.object(hass.config_entries, "async_reload") as mock_reload:
+        device_registry.async_update_device(zwave_device_id, name="Other name")
+        await hass.async_block_till_done()
+
+    assert not mock_reload.mock_calls
+    assert config_entry.state == config_entries.ConfigEntryState.LOADED
+    assert config_entry.title == "Other name"
 
     # Entity is renamed
     state = hass.states.get("event.device_name_button")
     assert state
     assert state.attributes.get("friendly_name") == "Other name Button"
 
+    device_registry.async_update_device(zwave_device_id, name_by_user="Front door")
+    await hass.async_block_till_done()
+
+    assert config_entry.title == "Front door"
+    state = hass.states.get("event.device_name_button")
+    assert state
+    assert state.attributes.get("friendly_name") == "Front door Button"
+    assert config_entry.runtime_data.device_entry.name_by_user == "Front door"
+
 
 @pytest.mark.parametrize(
     ("alarm_state", "delay", "property", "property_key", "value"),
@@ -283,3 +312,389 @@ async def test_composite_device_id_resolution(
 
     # CONF_DEVICE_ID in options should be updated from composite_id to zwave_device_id
     assert ring_entry.options["device_id"] == zwave_device_id
+    assert ring_entry.minor_version == 2
+
+
+async def test_migrated_entry_skips_cleanup(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test the one time helper device cleanup is skipped once migrated."""
+    assert config_entry.minor_version == 2
+
+    with patch(
+        "custom_components.ring_keypad.async_remove_helper_devices"
+    ) as mock_remove:
+        assert await hass.config_entries.async_reload(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert config_entry.state == config_entries.ConfigEntryState.LOADED
+    assert not mock_remove.mock_calls
+
+
+async def test_runtime_data(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test the keypad runtime data is created once for the entry."""
+    runtime_data = config_entry.runtime_data
+    assert runtime_data.zwave_device_id == zwave_device_id
+    assert runtime_data.device_entry.id == zwave_device_id
+    assert runtime_data.entity is not None
+    assert runtime_data.entity.entity_id == "event.device_name_button"
+
+
+async def test_keypad_index(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test loaded keypads are indexed by device id until they are unloaded."""
+    assert hass.data[DATA_KEYPADS] == {zwave_device_id: config_entry.runtime_data}
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.data[DATA_KEYPADS] == {}
+
+
+async def test_node_status(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    zwave_config_entry: MockConfigEntry,
+    config_entry: MockConfigEntry,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test commands are parked while the keypad node is dead."""
+    entity_registry.async_get_or_create(
+        "sensor",
+        "zwave_js",
+        "3245146787.12.node_status",
+        config_entry=zwave_config_entry,
+        device_id=zwave_device_id,
+        suggested_object_id="device_name_node_status",
+    )
+    hass.states.async_set("sensor.device_name_node_status", "dead")
+    # The node status sensor is found when the entry is set up
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    call_service = async_mock_service(hass, "zwave_js", "set_value")
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "armed_home"},
+        blocking=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    assert not call_service
+    assert hass.data[DATA_DISPATCHER].commands_parked == 1
+
+    hass.states.async_set("sensor.device_name_node_status", "alive")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(call_service) == 1
+    assert call_service[0].data["property"] == 10
+
+    # Reloading the entry while the node is asleep keeps the commands parked
+    hass.states.async_set("sensor.device_name_node_status", "asleep")
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        DOMAIN,
+        "chime",
+        service_data={"chime": "doorbell"},
+        blocking=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(call_service) == 1
+
+    hass.states.async_set("sensor.device_name_node_status", "alive")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(call_service) == 2
+
+    # Commands are sent when the entry no longer follows the node status
+    hass.states.async_set("sensor.device_name_node_status", "dead")
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    assert hass.data[DATA_DISPATCHER].is_ready(zwave_device_id)
+
+
+async def test_startup_many_keypads(
+    hass: HomeAssistant,
+    zwave_config_entry: MockConfigEntry,
+    device_registry: dr.DeviceRegistry,
+) -> None:
+    """Benchmark setting up many migrated keypads at startup."""
+    entries = []
+    for i in range(KEYPAD_COUNT):
+        device_entry = device_registry.async_get_or_create(
+            config_entry_id=zwave_config_entry.entry_id,
+            identifiers={("zwave_js", f"keypad-{i}")},
+            name=f"Keypad {i}",
+        )
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            options={"device_id": device_entry.id},
+            title=f"Keypad {i}",
+            minor_version=2,
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+
+    start = time.perf_counter()
+    with patch(
+        "custom_components.ring_keypad.async_remove_helper_devices"
+    ) as mock_remove:
+        # Entries are set up concurrently as Home Assistant does at startup
+        results = await asyncio.gather(
+            *(hass.config_entries.async_setup(entry.entry_id) for entry in entries)
+        )
+        await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    assert all(
+        entry.state == config_entries.ConfigEntryState.LOADED for entry in entries
+    )
+    assert not mock_remove.mock_calls
+    assert elapsed < STARTUP_BUDGET, f"Startup took {elapsed:.3f}s"
+
+
+@pytest.mark.parametrize(
+    ("service", "service_data"),
+    [
+        ("update_alarm_state", {"alarm_state": "armed_night"}),
+        ("update_alarm_state", {"alarm_state": "arming", "delay": 301}),
+        ("chime", {"chime": "siren"}),
+        ("chime", {"chime": "doorbell", "volume": 0}),
+        ("alarm", {"alarm": "flood"}),
+    ],
+)
+async def test_invalid_service_data(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+    service: str,
+    service_data: dict[str, Any],
+) -> None:
+    """Test invalid service data is rejected before sending any command."""
+
+    call_service = async_mock_service(hass, "zwave_js", "set_value")
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            service,
+            service_data=service_data,
+            blocking=True,
+            target={"device_id": [zwave_device_id]},
+        )
+    assert not call_service
+
+
+async def test_send_commands_service(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test sending a sequence of commands to the keypad."""
+
+    call_service = async_mock_service(hass, "zwave_js", "set_value")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "send_commands",
+        service_data={
+            "commands": [
+                {"chime": "doorbell"},
+                {"alarm_state": "arming", "delay": 60},
+                {"alarm": "smoke", "volume": 50},
+            ],
+        },
+        blocking=True,
+        return_response=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    assert response == {
+        "results": [
+            {"device_id": zwave_device_id, "step": 0, "success": True},
+            {"device_id": zwave_device_id, "step": 1, "success": True},
+            {"device_id": zwave_device_id, "step": 2, "success": True},
+        ]
+    }
+    assert [
+        (call.data["property"], call.data["property_key"], call.data["value"])
+        for call in call_service
+    ] == [(100, 9, 100), (18, "timeout", "1m0s"), (14, 9, 50)]
+    assert all(call.data["device_id"] == [zwave_device_id] for call in call_service)
+
+
+async def test_send_commands_shadow_state(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test alarm state steps update the state refreshed on the keypad."""
+
+    async_mock_service(hass, "zwave_js", "set_value")
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "armed_away"},
+        blocking=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    await hass.services.async_call(
+        DOMAIN,
+        "send_commands",
+        service_data={"commands": [{"alarm_state": "disarmed"}]},
+        blocking=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    shadow = hass.data[DATA_DISPATCHER].shadow[zwave_device_id]
+    assert shadow.command["property"] == 2
+
+
+async def test_unload_removes_shadow_state(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test an unloaded keypad is no longer refreshed."""
+
+    async_mock_service(hass, "zwave_js", "set_value")
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "armed_away"},
+        blocking=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    dispatcher = hass.data[DATA_DISPATCHER]
+    assert zwave_device_id in dispatcher.shadow
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert zwave_device_id not in dispatcher.shadow
+
+
+async def test_send_commands_failure(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test a failed step is reported and does not stop later steps."""
+
+    calls: list[ServiceCall] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call)
+        if len(calls) == 1:
+            raise HomeAssistantError("Node timeout")
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+
+    service_data = {
+        "commands": [{"chime": "doorbell"}, {"alarm_state": "disarmed"}],
+    }
+    response = await hass.services.async_call(
+        DOMAIN,
+        "send_commands",
+        service_data=service_data,
+        blocking=True,
+        return_response=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    assert response == {
+        "results": [
+            {
+                "device_id": zwave_device_id,
+                "step": 0,
+                "success": False,
+                "error": "Node timeout",
+            },
+            {"device_id": zwave_device_id, "step": 1, "success": True},
+        ]
+    }
+    assert len(calls) == 2
+
+    calls.clear()
+    with pytest.raises(HomeAssistantError, match="Failed to send 1 of 2"):
+        await hass.services.async_call(
+            DOMAIN,
+            "send_commands",
+            service_data=service_data,
+            blocking=True,
+            target={"device_id": [zwave_device_id]},
+        )
+
+
+async def test_send_commands_superseded(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test a countdown step replaced by a disarm is reported as superseded."""
+
+    async def set_value(call: ServiceCall) -> None:
+        if call.data["property"] == 18:  # Exit delay
+            await asyncio.sleep(10)
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+
+    send_commands = hass.async_create_task(
+        hass.services.async_call(
+            DOMAIN,
+            "send_commands",
+            service_data={"commands": [{"alarm_state": "arming", "delay": 60}]},
+            blocking=True,
+            return_response=True,
+            target={"device_id": [zwave_device_id]},
+        )
+    )
+    await asyncio.sleep(0.01)
+    await hass.services.async_call(
+        DOMAIN,
+        "update_alarm_state",
+        service_data={"alarm_state": "disarmed"},
+        blocking=True,
+        target={"device_id": [zwave_device_id]},
+    )
+    assert await send_commands == {
+        "results": [
+            {
+                "device_id": zwave_device_id,
+                "step": 0,
+                "success": False,
+                "superseded": True,
+            }
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "commands",
+    [
+        [],
+        [{"wait": 1}],
+        [{"chime": "doorbell", "alarm": "smoke"}],
+        [{"chime": "siren"}],
+    ],
+)
+async def test_send_commands_invalid(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+    commands: list[dict[str, Any]],
+) -> None:
+    """Test invalid command sequences are rejected."""
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            "send_commands",
+            service_data={"commands": commands},
+            blocking=True,
+            target={"device_id": [zwave_device_id]},
+        )
@@ -0,0 +1,110 @@
+"""Tests for the keypad recorder statistics script."""
+
+import datetime
+import importlib.util
+import json
+import pathlib
+import sqlite3
+import sys
+from types import ModuleType
+
+import pytest
+
+SCRIPT = pathlib.Path(__file__).parent.parent / "script" / "keypad_stats.py"
+KEYPAD_ENTITY = "event.front_door_button"
+OTHER_ENTITY = "event.doorbell"
+START_TS = datetime.datetime(2024, 4, 1, 8, 0, tzinfo=datetime.UTC).timestamp()
+
+SCHEMA = """
+CREATE TABLE states_meta (metadata_id INTEGER PRIMARY KEY, entity_id TEXT);
+CREATE TABLE state_attributes (attributes_id INTEGER PRIMARY KEY, shared_attrs TEXT);
+CREATE TABLE states (
+    state_id INTEGER PRIMARY KEY,
+    state TEXT,
+    last_updated_ts REAL,
+    metadata_id INTEGER,
+    attributes_id INTEGER
+);
+"""
+
+
+@pytest.fixture(name="keypad_stats", scope="module")
+def mock_keypad_stats() -> ModuleType:
+    """Load the script as a module."""
+    spec = importlib.util.spec_from_file_location("keypad_stats", SCRIPT)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(name="database")
+def mock_database(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Create a recorder database with keypad history."""
+    database = tmp_path / "home-assistant_v2.db"
+    conn = sqlite3.connect(database)
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT INTO states_meta VALUES (1, ?)", (KEYPAD_ENTITY,))
+    conn.execute("INSERT INTO states_meta VALUES (2, ?)", (OTHER_ENTITY,))
+    history: list[tuple[int, str, float, dict[str, str] | None]] = [
+        (1, "unknown", 0, None),
+        (1, "t", 0, {"event_type": "pressed", "button": "code_started"}),
+        (1, "t", 5, {"event_type": "pressed", "button": "code_timeout"}),
+        (1, "t", 60, {"event_type": "alarm_arm_away", "button": "arm_away"}),
+        (1, "t", 90, {"event_type": "alarm_disarm", "button": "code_entered"}),
+        (1, "t", 3600, {"event_type": "alarm_arm_home", "button": "arm_stay"}),
+        (1, "t", 7200, {"event_type": "alarm_disarm", "button": "disarm"}),
+        (2, "t", 10, {"event_type": "ring"}),
+    ]
+    for state_id, (metadata_id, state, offset, attributes) in enumerate(history):
+        attributes_id = None
+        if attributes is not None:
+            attributes_id = state_id
+            conn.execute(
+                "INSERT INTO state_attributes VALUES (?, ?)",
+                (attributes_id, json.dumps(attributes)),
+            )
+        conn.execute(
+            "INSERT INTO states VALUES (?, ?, ?, ?, ?)",
+            (state_id, state, START_TS + offset, metadata_id, attributes_id),
+        )
+    conn.commit()
+    conn.close()
+    return database
+
+
+def test_analyze(keypad_stats: ModuleType, database: pathlib.Path) -> None:
+    """Test statistics computed from the recorder history."""
+    results = keypad_stats.analyze(database, tz=datetime.UTC)
+    assert len(results) == 1
+    stats = results[0]
+    assert stats.entity_id == KEYPAD_ENTITY
+    assert stats.keypresses == 6
+    assert stats.keypresses_per_hour[8] == 4
+    assert stats.keypresses_per_hour[9] == 1
+    assert stats.keypresses_per_hour[10] == 1
+    assert stats.buttons["code_started"] == 1
+    assert stats.code_timeouts == 1
+    assert stats.arming_cancelled == 1
+    assert stats.first_seen == START_TS
+    assert stats.last_seen == START_TS + 7200
+
+
+def test_iter_history_batches(keypad_stats: ModuleType, database: pathlib.Path) -> None:
+    """Test rows are streamed across multiple batches."""
+    conn = sqlite3.connect(database)
+    rows = list(keypad_stats.iter_history(conn, KEYPAD_ENTITY, batch_size=2))
+    conn.close()
+    assert len(rows) == 7
+
+
+def test_main_report(
+    keypad_stats: ModuleType, database: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    """Test writing the report file."""
+    output = tmp_path / "report.json"
+    assert keypad_stats.main([str(database), "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert [stats["entity_id"] for stats in report] == [KEYPAD_ENTITY]
+    assert report[0]["arming_cancelled"] == 1
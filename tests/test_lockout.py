@@ -0,0 +1,52 @@
+"""Tests for Ring Keypad code attempt limits."""
+
+import sys
+
+from custom_components.ring_keypad.lockout import CodeAttemptLimiter
+
+
+def test_sliding_window() -> None:
+    """Test attempts are allowed again once they leave the window."""
+    limiter = CodeAttemptLimiter(3, window=60, lockout=300)
+
+    assert limiter.attempt(0)
+    assert limiter.attempt(30)
+    assert limiter.attempt(59)
+    # The first attempt has left the window
+    assert limiter.attempt(61)
+    assert limiter.lockouts == 0
+
+
+def test_lockout() -> None:
+    """Test too many attempts lock out code entry."""
+    limiter = CodeAttemptLimiter(3, window=60, lockout=300)
+
+    assert all(limiter.attempt(now) for now in (0, 1, 2))
+    assert not limiter.attempt(3)
+    assert limiter.lockouts == 1
+    assert not limiter.attempt(200)
+    assert limiter.attempt(303)
+    assert limiter.lockouts == 1
+
+
+def test_reset() -> None:
+    """Test an accepted code resets the attempts."""
+    limiter = CodeAttemptLimiter(2)
+
+    assert limiter.attempt(0)
+    assert limiter.attempt(1)
+    limiter.reset()
+    assert limiter.attempt(2)
+
+
+def test_fixed_memory() -> None:
+    """Test memory does not grow with the number of attempts."""
+    limiter = CodeAttemptLimiter(5, window=1, lockout=0)
+    for now in range(5):
+        limiter.attempt(now)
+    size = sys.getsizeof(limiter._attempts)
+
+    for now in range(5, 10000):
+        limiter.attempt(now)
+    assert sys.getsizeof(limiter._attempts) == size
+    assert not hasattr(limiter, "__dict__")
@@ -0,0 +1,136 @@
+"""Memory budget tests for large fleets of Ring Keypads."""
+
+import gc
+import tracemalloc
+from typing import Any
+
+import pytest
+from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ring_keypad.const import DOMAIN
+
+KEYPADS = 100
+# Bytes allocated by the integration for each loaded keypad
+KEYPAD_BUDGET = 32 * 1024
+# Bytes allocated for a burst of notifications to a single keypad, which is
+# mostly the event entity's state strings cached by Home Assistant
+TRAFFIC_BUDGET = 64 * 1024
+NOTIFICATIONS = 2000
+
+
+def notification(device_id: str, event_type: int = 3) -> dict[str, Any]:
+    """Return an Entry Control notification from a keypad."""
+    return {
+        "domain": "zwave_js",
+        "node_id": 30,
+        "home_id": 3949593794,
+        "endpoint": 0,
+        "device_id": device_id,
+        "command_class": 111,
+        "command_class_name": "Entry Control",
+        "event_type": event_type,
+        "event_type_label": "Ignored",
+        "data_type": 0,
+        "data_type_label": "None",
+        "event_data": None,
+    }
+
+
+def allocated() -> int:
+    """Return the bytes currently traced after a full collection."""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+@pytest.fixture(name="zwave_device_ids")
+def mock_zwave_device_ids(
+    hass: HomeAssistant,
+    device_registry: dr.DeviceRegistry,
+    zwave_config_entry: MockConfigEntry,
+) -> list[str]:
+    """Fixture for the Z-Wave JS devices of a fleet of keypads."""
+    return [
+        device_registry.async_get_or_create(
+            config_entry_id=zwave_config_entry.entry_id,
+            identifiers={("zwave_js", f"3949593794-{node_id}")},
+            name=f"Keypad {node_id}",
+        ).id
+        for node_id in range(KEYPADS + 1)
+    ]
+
+
+async def setup_keypads(hass: HomeAssistant, device_ids: list[str]) -> None:
+    """Add and load a config entry for each keypad."""
+    for device_id in device_ids:
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            options={CONF_DEVICE_ID: device_id},
+            title=device_id,
+        )
+        config_entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_per_keypad_budget(
+    hass: HomeAssistant, zwave_device_ids: list[str]
+) -> None:
+    """Test the memory used by each loaded keypad stays under budget."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    # The first keypad also loads the platform and shared state
+    await setup_keypads(hass, zwave_device_ids[:1])
+
+    tracemalloc.start()
+    try:
+        before = allocated()
+        await setup_keypads(hass, zwave_device_ids[1:])
+        per_keypad = (allocated() - before) / KEYPADS
+    finally:
+        tracemalloc.stop()
+
+    assert len(hass.states.async_entity_ids("event")) == KEYPADS + 1
+    assert per_keypad < KEYPAD_BUDGET
+
+
+async def test_traffic_does_not_grow(
+    hass: HomeAssistant, zwave_device_ids: list[str]
+) -> None:
+    """Test notifications to one keypad do not grow state for the others."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    await setup_keypads(hass, zwave_device_ids)
+    # Every keypad shares a single notification listener
+    assert hass.bus.async_listeners()["zwave_js_notification"] == 1
+
+    busy_keypad = zwave_device_ids[0]
+    # Warm up caches on the first notifications before measuring
+    for event_type in (3, 5, 6):
+        hass.bus.async_fire(
+            "zwave_js_notification", notification(busy_keypad, event_type)
+        )
+    await hass.async_block_till_done()
+
+    tracemalloc.start()
+    try:
+        before = allocated()
+        for index in range(NOTIFICATIONS):
+            hass.bus.async_fire(
+                "zwave_js_notification",
+                notification(busy_keypad, (3, 5, 6)[index % 3]),
+            )
+            if index % 100 == 0:
+                await hass.async_block_till_done()
+        await hass.async_block_till_done()
+        growth = allocated() - before
+    finally:
+        tracemalloc.stop()
+
+    assert growth < TRAFFIC_BUDGET
+
+    # The shared listener is removed along with the last keypad
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert "zwave_js_notification" not in hass.bus.async_listeners()
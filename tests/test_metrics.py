@@ -0,0 +1,94 @@
+"""Tests for the Ring Keypad OpenMetrics view."""
+
+from http import HTTPStatus
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
+
+from custom_components.ring_keypad.const import DOMAIN
+
+from .test_event import fire_keypad_event
+
+METRICS_URL = "/api/ring_keypad/metrics"
+
+
+@pytest.fixture(autouse=True)
+async def mock_setup_integration(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Setup the integration"""
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+
+async def test_metrics(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    zwave_device_id: str,
+    zwave_config_entry: MockConfigEntry,
+) -> None:
+    """Test keypad and controller counters are served in OpenMetrics format."""
+    async_mock_service(hass, "zwave_js", "set_value")
+    fire_keypad_event(hass, zwave_device_id, 3, None)
+    fire_keypad_event(hass, zwave_device_id, 3, None)
+    fire_keypad_event(hass, zwave_device_id, 12345, None)
+    await hass.services.async_call(
+        DOMAIN,
+        "chime",
+        {"chime": "invalid_code", "device_id": zwave_device_id},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    response = await client.get(METRICS_URL)
+    assert response.status == HTTPStatus.OK
+    assert response.headers["Content-Type"].startswith(
+        "application/openmetrics-text; version=1.0.0"
+    )
+    text = await response.text()
+    lines = text.splitlines()
+    assert lines[-1] == "# EOF"
+
+    keypad = f'device_id="{zwave_device_id}"'
+    controller = f'controller="{zwave_config_entry.entry_id}"'
+    samples = dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+    assert samples[f"ring_keypad_events_decoded_total{{{keypad}}}"] == "2"
+    assert (
+        samples[f'ring_keypad_events_rejected_total{{{keypad},reason="unknown"}}']
+        == "1"
+    )
+    assert (
+        samples[f'ring_keypad_events_rejected_total{{{keypad},reason="duplicate"}}']
+        == "1"
+    )
+    assert samples[f"ring_keypad_keypad_commands_total{{{keypad}}}"] == "1"
+    assert samples[f"ring_keypad_commands_sent_total{{{controller}}}"] == "1"
+    assert samples[f"ring_keypad_queue_depth{{{controller}}}"] == "0"
+    assert (
+        samples[f'ring_keypad_command_latency_seconds_bucket{{{controller},le="+Inf"}}']
+        == "1"
+    )
+    assert samples[f"ring_keypad_command_latency_seconds_count{{{controller}}}"] == "1"
+    assert samples["ring_keypad_dedup_hits_total"] == "0"
+
+    # Every sample belongs to the family declared before it
+    families = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+    assert len(families) == len(set(families))
+    for name in samples:
+        assert name.split("{")[0].startswith(tuple(families))
+
+
+async def test_metrics_requires_auth(
+    hass: HomeAssistant, hass_client_no_auth: ClientSessionGenerator
+) -> None:
+    """Test the metrics are not served without authentication."""
+    client = await hass_client_no_auth()
+    response = await client.get(METRICS_URL)
+    assert response.status == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,61 @@
+"""Tests for the Ring Keypad data model."""
+
+import json
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from homeassistant.components.alarm_control_panel import AlarmControlPanelState
+
+from custom_components.ring_keypad.model import ALARM_STATE
+
+# The integration imports in about 50ms once Home Assistant core and the
+# manifest dependencies are loaded. A full second leaves room for a cold disk
+# cache while still catching a component that pulls in a large part of Home
+# Assistant.
+IMPORT_BUDGET = 1.0
+
+IMPORT_SCRIPT = textwrap.dedent(
+    """
+    import json
+    import sys
+    import time
+
+    # Home Assistant core and the manifest dependencies are already loaded
+    # when the integration is imported
+    import homeassistant.core
+    import homeassistant.helpers.config_validation
+    import homeassistant.helpers.entity_platform
+    import homeassistant.components.http
+    import homeassistant.components.websocket_api
+
+    before = set(sys.modules)
+    start = time.perf_counter()
+    import custom_components.ring_keypad.{module}
+    elapsed = time.perf_counter() - start
+    print(json.dumps({{"elapsed": elapsed, "modules": sorted(set(sys.modules) - before)}}))
+    """
+)
+
+
+def test_alarm_states() -> None:
+    """Test the alarm states match the Alarm Control Panel entity states."""
+    for state in ALARM_STATE:
+        assert AlarmControlPanelState(state) == state
+
+
+@pytest.mark.parametrize("module", ["config_flow", "event"])
+def test_import_time(module: str) -> None:
+    """Test loading the integration does not import unrelated components."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(module=module)],
+        capture_output=True,
+        check=True,
+        cwd=pathlib.Path(__file__).parent.parent,
+        text=True,
+    )
+    data = json.loads(result.stdout)
+    assert "homeassistant.components.alarm_control_panel" not in data["modules"]
+    assert data["elapsed"] < IMPORT_BUDGET, f"Import took {data['elapsed']:.3f}s"
@@ -0,0 +1,125 @@
+"""Tests for profiling the Ring Keypad hot paths."""
+
+import asyncio
+import pathlib
+import time
+from unittest.mock import patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_service,
+)
+
+from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.profiler import ProfileSession, timed
+
+from .test_event import fire_keypad_event
+
+OVERHEAD_CALLS = 100000
+# A disabled wrapper adds about 120ns per call. Two microseconds per call is
+# still small next to handling a keypad event, which is what matters.
+OVERHEAD_BUDGET = 2e-6
+
+
+@pytest.fixture(autouse=True)
+async def mock_setup_integration(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Setup the integration"""
+    hass.config.config_dir = str(tmp_path)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+
+async def test_profile(
+    hass: HomeAssistant,
+    zwave_device_id: str,
+    freezer: FrozenDateTimeFactory,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test profiling keypad events and commands."""
+    async_mock_service(hass, "zwave_js", "set_value")
+
+    # Keep hold of the session to check what it recorded after it stopped
+    with patch.object(
+        ProfileSession, "stop", autospec=True, side_effect=ProfileSession.stop
+    ) as mock_stop:
+        profile = hass.async_create_task(
+            hass.services.async_call(
+                DOMAIN,
+                "profile",
+                {"seconds": 10, "cprofile": True},
+                blocking=True,
+                return_response=True,
+            )
+        )
+        await asyncio.sleep(0)
+
+        fire_keypad_event(hass, zwave_device_id, 2, "1234")
+        await hass.services.async_call(
+            DOMAIN,
+            "chime",
+            {"chime": "doorbell", "device_id": zwave_device_id},
+            blocking=True,
+        )
+        with pytest.raises(ServiceValidationError, match="already running"):
+            await hass.services.async_call(
+                DOMAIN, "profile", {"seconds": 1}, blocking=True
+            )
+
+        freezer.tick(11)
+        async_fire_time_changed(hass)
+        response = await profile
+
+    assert response
+    assert set(response["timings"]) == {
+        "dispatch",
+        "handle_event",
+        "resolve_device_ids",
+        "zwave_set_value",
+    }
+    assert response["timings"]["handle_event"]["count"] == 1
+    report = pathlib.Path(response["report"])
+    assert report.parent == tmp_path
+    text = await hass.async_add_executor_job(report.read_text)
+    assert "handle_event" in text
+    assert "cumulative" in text
+
+    # Nothing is recorded once the profile has finished
+    assert not ProfileSession.is_running()
+    session = mock_stop.call_args.args[0]
+    recorded = {name: len(timings) for name, timings in session._timings.items()}
+    fire_keypad_event(hass, zwave_device_id, 3, None)
+    await hass.async_block_till_done()
+    assert not ProfileSession.is_running()
+    assert {
+        name: len(timings) for name, timings in session._timings.items()
+    } == recorded
+
+
+def test_disabled_overhead() -> None:
+    """Test timed functions add almost no overhead when not profiling."""
+
+    def handler(value: int) -> int:
+        return value
+
+    wrapped = timed("handler")(handler)
+
+    start = time.perf_counter()
+    for value in range(OVERHEAD_CALLS):
+        handler(value)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in range(OVERHEAD_CALLS):
+        wrapped(value)
+    overhead = (time.perf_counter() - start - baseline) / OVERHEAD_CALLS
+    assert overhead < OVERHEAD_BUDGET, f"Overhead was {overhead * 1e9:.0f}ns"
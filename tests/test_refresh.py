@@ -0,0 +1,213 @@
+"""Tests for the Ring Keypad state refresh."""
+
+import asyncio
+import itertools
+from collections.abc import AsyncGenerator
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+    async_mock_service,
+)
+
+from custom_components.ring_keypad.dispatch import CommandDispatcher, CommandRequest
+from custom_components.ring_keypad.model import alarm_state_command
+from custom_components.ring_keypad.refresh import StateRefresher
+
+INTERVAL = 60
+DEVICE_IDS = ("keypad-1", "keypad-2", "keypad-3")
+
+
+@pytest.fixture(name="dispatcher")
+def mock_dispatcher(hass: HomeAssistant) -> CommandDispatcher:
+    """Fixture for the command dispatcher."""
+    return CommandDispatcher(hass, idempotency_window=0)
+
+
+@pytest.fixture(name="refresher")
+async def mock_refresher(
+    hass: HomeAssistant, dispatcher: CommandDispatcher
+) -> AsyncGenerator[StateRefresher]:
+    """Fixture for a running state refresher."""
+    refresher = StateRefresher(hass, dispatcher, INTERVAL)
+    stop = refresher.async_start()
+    yield refresher
+    stop()
+    await hass.async_block_till_done()
+
+
+async def send_alarm_state(
+    dispatcher: CommandDispatcher,
+    alarm_state: str,
+    device_ids: tuple[str, ...] = DEVICE_IDS,
+) -> None:
+    """Send an alarm state to the keypads."""
+    await dispatcher.async_send_alarm_state(
+        CommandRequest(
+            device_ids,
+            alarm_state_command(alarm_state, None),
+            alarm_state=alarm_state,
+        )
+    )
+
+
+async def advance(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: int
+) -> None:
+    """Advance time one second at a time."""
+    for _ in range(seconds):
+        freezer.tick(1)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+
+async def test_refresh_spread(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    dispatcher: CommandDispatcher,
+    refresher: StateRefresher,
+) -> None:
+    """Test keypads are refreshed one at a time spread across the interval."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    await send_alarm_state(dispatcher, "armed_away")
+    assert len(set_value) == 1
+    set_value.clear()
+
+    sent: list[tuple[str, float]] = []
+
+    async def record(call: ServiceCall) -> None:
+        sent.append((call.data["device_id"][0], hass.loop.time()))
+
+    hass.services.async_register("zwave_js", "set_value", record)
+    await advance(hass, freezer, 3 * INTERVAL)
+
+    assert {device_id for device_id, _ in sent} == set(DEVICE_IDS)
+    times = [timestamp for _, timestamp in sent]
+    gaps = [later - earlier for earlier, later in itertools.pairwise(times)]
+    # Keypads are at least half a slot apart, allowing for the one second ticks
+    assert min(gaps) >= INTERVAL / len(DEVICE_IDS) / 2 - 1
+    assert refresher.refreshes_sent == len(sent)
+
+
+async def test_countdown_not_refreshed(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    dispatcher: CommandDispatcher,
+    refresher: StateRefresher,
+) -> None:
+    """Test keypads in an exit delay are not refreshed."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    await send_alarm_state(dispatcher, "arming")
+    await hass.async_block_till_done()
+    assert len(set_value) == 3
+
+    await advance(hass, freezer, 2 * INTERVAL)
+    assert len(set_value) == 3
+    assert refresher.refreshes_sent == 0
+
+
+async def test_alarm_not_refreshed(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    dispatcher: CommandDispatcher,
+    refresher: StateRefresher,
+) -> None:
+    """Test a triggered alarm does not sound again on every refresh."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    await send_alarm_state(dispatcher, "disarmed")
+    await send_alarm_state(dispatcher, "triggered")
+    assert len(set_value) == 2
+    assert not dispatcher.shadow
+
+    await advance(hass, freezer, 2 * INTERVAL)
+    assert len(set_value) == 2
+    assert refresher.refreshes_sent == 0
+
+
+async def test_failed_state_refreshed(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    dispatcher: CommandDispatcher,
+    refresher: StateRefresher,
+) -> None:
+    """Test a keypad that missed its state is refreshed."""
+    calls: list[ServiceCall] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call)
+        if len(calls) == 1:
+            raise HomeAssistantError("Node timeout")
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    with pytest.raises(HomeAssistantError):
+        await send_alarm_state(dispatcher, "disarmed", DEVICE_IDS[:1])
+    await send_alarm_state(dispatcher, "disarmed", DEVICE_IDS[1:])
+    assert len(calls) == 2
+
+    assert dispatcher.shadow[DEVICE_IDS[0]].confirmed is None
+
+    await advance(hass, freezer, INTERVAL + INTERVAL // 4)
+    assert calls[2].data["device_id"] == [DEVICE_IDS[0]]
+    assert dispatcher.shadow[DEVICE_IDS[0]].confirmed is not None
+
+
+async def test_recently_confirmed_skipped(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    dispatcher: CommandDispatcher,
+    refresher: StateRefresher,
+) -> None:
+    """Test a keypad confirmed just before its refresh is skipped."""
+    set_value = async_mock_service(hass, "zwave_js", "set_value")
+    await send_alarm_state(dispatcher, "armed_home")
+    await advance(hass, freezer, INTERVAL + 24)
+    set_value.clear()
+
+    # The second keypad is refreshed 25 to 35 seconds into the interval
+    await send_alarm_state(dispatcher, "disarmed", DEVICE_IDS[1:2])
+    await advance(hass, freezer, INTERVAL - 24)
+    assert [call.data["device_id"] for call in set_value] == [
+        [DEVICE_IDS[1]],
+        [DEVICE_IDS[2]],
+    ]
+    assert refresher.refreshes_skipped == 1
+
+
+async def test_paused_while_busy(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    dispatcher: CommandDispatcher,
+    refresher: StateRefresher,
+) -> None:
+    """Test refreshes wait while other commands are being sent."""
+    async_mock_service(hass, "zwave_js", "set_value")
+    await send_alarm_state(dispatcher, "disarmed")
+
+    release = asyncio.Event()
+    calls: list[ServiceCall] = []
+
+    async def set_value(call: ServiceCall) -> None:
+        calls.append(call)
+        if len(calls) == 1:
+            await release.wait()
+
+    hass.services.async_register("zwave_js", "set_value", set_value)
+    chime = hass.async_create_background_task(
+        dispatcher.async_send(CommandRequest(("other",), {"property": 99})),
+        "chime",
+    )
+    await asyncio.sleep(0)
+    assert dispatcher.busy
+
+    await advance(hass, freezer, 2 * INTERVAL)
+    assert len(calls) == 1
+    assert refresher.refreshes_sent == 0
+
+    release.set()
+    await chime
+    await advance(hass, freezer, 2)
+    assert len(calls) == 2
+    assert refresher.refreshes_sent == 1
@@ -0,0 +1,86 @@
+"""Tests for the live stream of keypad activity."""
+
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.ring_keypad.stream import BATCH_WINDOW, KeypadEventStream
+
+COMMAND = {"command_class": "135", "property": 98, "property_key": 9, "value": 100}
+
+
+async def flush(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Advance past the batch window."""
+    freezer.tick(BATCH_WINDOW)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_batches(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test activity is sent in one batch per window in a compact form."""
+    stream = KeypadEventStream(hass)
+    batches: list[list[dict[str, Any]]] = []
+
+    # Nothing is collected without subscribers
+    stream.async_publish_keypress("a", "disarm", "alarm_disarm", None)
+    unsub = stream.async_subscribe(batches.append)
+    assert stream.has_subscribers
+    await flush(hass, freezer)
+    assert not batches
+
+    stream.async_publish_keypress("a", "code_entered", "alarm_disarm", "1234")
+    stream.async_publish_command(["a", "b"], COMMAND, 0.0123)
+    stream.async_publish_command(["b"], COMMAND, 0.5, HomeAssistantError("Timeout"))
+    assert not batches
+    await flush(hass, freezer)
+    assert len(batches) == 1
+    for message in batches[0]:
+        assert isinstance(message.pop("t"), float)
+    assert batches[0] == [
+        {"k": "keypress", "d": "a", "b": "code_entered", "e": "alarm_disarm"},
+        {"k": "command", "d": "a", "p": 98, "v": 100, "ok": True, "ms": 12.3},
+        {"k": "command", "d": "b", "p": 98, "v": 100, "ok": True, "ms": 12.3},
+        {
+            "k": "command",
+            "d": "b",
+            "p": 98,
+            "v": 100,
+            "ok": False,
+            "ms": 500.0,
+            "err": "Timeout",
+        },
+    ]
+
+    unsub()
+    assert not stream.has_subscribers
+    stream.async_publish_keypress("a", "disarm", "alarm_disarm", None)
+    await flush(hass, freezer)
+    assert len(batches) == 1
+
+
+async def test_subscriber_filters(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test each subscriber only gets its keypads and codes if requested."""
+    stream = KeypadEventStream(hass)
+    all_keypads: list[list[dict[str, Any]]] = []
+    keypad_b: list[list[dict[str, Any]]] = []
+    with_code: list[list[dict[str, Any]]] = []
+    stream.async_subscribe(all_keypads.append)
+    stream.async_subscribe(keypad_b.append, device_ids=frozenset({"b"}))
+    stream.async_subscribe(with_code.append, include_code=True)
+
+    stream.async_publish_keypress("a", "code_entered", "alarm_disarm", "1234")
+    await flush(hass, freezer)
+    assert [message["d"] for message in all_keypads[0]] == ["a"]
+    assert "c" not in all_keypads[0][0]
+    assert not keypad_b
+    assert with_code[0][0]["c"] == "1234"
+
+    stream.async_publish_keypress("b", "disarm", "alarm_disarm", None)
+    await flush(hass, freezer)
+    assert [message["d"] for message in keypad_b[0]] == ["b"]
+    assert "c" not in with_code[1][0]
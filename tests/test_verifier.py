@@ -0,0 +1,28 @@
+"""Tests for local verification of Ring Keypad codes."""
+
+from custom_components.ring_keypad.verifier import CodeVerifier
+
+
+def test_verify() -> None:
+    """Test codes are checked against the salted hashes."""
+    verifier = CodeVerifier.from_codes(["1234", "987654"])
+
+    assert verifier.verify("1234")
+    assert verifier.verify("987654")
+    assert not verifier.verify("4321")
+    assert not verifier.verify("")
+    assert "1234" not in verifier.hashes
+
+    # The verifier can be restored from the stored salt and hashes
+    restored = CodeVerifier(verifier.salt, sorted(verifier.hashes))
+    assert restored.verify("1234")
+    assert not restored.verify("4321")
+
+
+def test_salted() -> None:
+    """Test the same code hashes differently with each salt."""
+    first = CodeVerifier.from_codes(["1234"])
+    second = CodeVerifier.from_codes(["1234"])
+
+    assert first.salt != second.salt
+    assert first.hashes != second.hashes
@@ -0,0 +1,128 @@
+"""Tests for the Ring Keypad WebSocket API."""
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_service,
+)
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.ring_keypad.const import DOMAIN
+from custom_components.ring_keypad.data import DATA_KEYPADS
+from custom_components.ring_keypad.stream import BATCH_WINDOW
+
+from .test_event import fire_keypad_event
+
+
+@pytest.fixture(autouse=True)
+async def mock_setup_integration(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Setup the integration"""
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+
+async def test_subscribe(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    zwave_device_id: str,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test keypresses and command outcomes are streamed without codes."""
+    async_mock_service(hass, "zwave_js", "set_value")
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {"type": "ring_keypad/subscribe", "device_id": [zwave_device_id]}
+    )
+    result = await client.receive_json()
+    assert result["success"]
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    await hass.services.async_call(
+        DOMAIN,
+        "chime",
+        {"chime": "invalid_code", "device_id": zwave_device_id},
+        blocking=True,
+    )
+    freezer.tick(BATCH_WINDOW)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    msg = await client.receive_json()
+    assert msg["type"] == "event"
+    events = msg["event"]["events"]
+    assert [(event["k"], event["d"]) for event in events] == [
+        ("keypress", zwave_device_id),
+        ("command", zwave_device_id),
+    ]
+    assert events[0]["b"] == "code_entered"
+    assert "c" not in events[0]
+    assert events[1]["ok"]
+
+
+async def test_subscribe_keypad_device(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    zwave_device_id: str,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test subscribing with a keypad device id resolves its Z-Wave JS device."""
+    hass.data[DATA_KEYPADS]["keypad-device-id"] = config_entry.runtime_data
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {"type": "ring_keypad/subscribe", "device_id": ["keypad-device-id"]}
+    )
+    result = await client.receive_json()
+    assert result["success"]
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    freezer.tick(BATCH_WINDOW)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    msg = await client.receive_json()
+    assert msg["event"]["events"][0]["d"] == zwave_device_id
+
+
+async def test_subscribe_include_code(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    zwave_device_id: str,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test codes are only streamed when requested."""
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {"type": "ring_keypad/subscribe", "include_code": True}
+    )
+    result = await client.receive_json()
+    assert result["success"]
+
+    fire_keypad_event(hass, zwave_device_id, 2, "1234")
+    freezer.tick(BATCH_WINDOW)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    msg = await client.receive_json()
+    assert msg["event"]["events"][0]["c"] == "1234"
+
+
+async def test_include_code_requires_admin(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    hass_read_only_access_token: str,
+) -> None:
+    """Test only admins can stream codes."""
+    client = await hass_ws_client(hass, hass_read_only_access_token)
+    await client.send_json_auto_id(
+        {"type": "ring_keypad/subscribe", "include_code": True}
+    )
+    result = await client.receive_json()
+    assert not result["success"]
+    assert result["error"]["code"] == "unauthorized"